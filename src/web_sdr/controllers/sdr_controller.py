@@ -6,7 +6,6 @@ Handles RTL-SDR device management, data acquisition and processing
 import asyncio
 import logging
 import time
-from datetime import datetime
 from typing import Optional, Dict, Any, Tuple, Union
 import threading
 from queue import Queue, Empty
@@ -21,6 +20,18 @@ from ..dsp.demodulators import AudioDemodulators
 
 logger = logging.getLogger(__name__)
 
+def bytes_to_iq(raw) -> np.ndarray:
+    """
+    Convert interleaved unsigned 8-bit RTL-SDR samples to complex64 IQ
+    
+    Same scaling as pyrtlsdr's read_samples, but done in a single float32
+    buffer that is reinterpreted as complex64 instead of building complex128.
+    """
+    iq = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+    iq -= 127.5
+    iq *= 1 / 127.5
+    return iq.view(np.complex64)
+
 class WebSDRController:
     """Main controller for RTL-SDR operations in web environment"""
     
@@ -50,6 +61,8 @@ class WebSDRController:
             sample_rate=config.rtlsdr_sample_rate
         )
         self.audio_demodulator = AudioDemodulators()
+        # Audio bandwidth-limit filter coefficients per bandwidth (designed once)
+        self._bandwidth_filter_cache = {}
         
         # Data streaming
         self.data_queue = Queue(maxsize=10)
@@ -57,17 +70,21 @@ class WebSDRController:
         self.audio_data = None
         self.acquisition_thread = None
         
-        # Audio buffering for smooth streaming
-        self.audio_buffer = []
         # Optimal chunk size for smooth audio (100ms for better continuity)
         self.target_audio_chunk_size = config.audio_sample_rate // 10  # 100ms chunks = 4800 samples
+        # Audio buffering for smooth streaming (preallocated, first audio_buffer_fill valid)
+        self.audio_buffer = np.zeros(self.target_audio_chunk_size * 4, dtype=np.float32)
+        self.audio_buffer_fill = 0
         
         # Performance tracking
         self.stats = {
             'samples_processed': 0,
             'fps': 0.0,
-            'last_fps_time': time.time(),
-            'processing_times': []
+            'last_fps_time': time.monotonic(),  # FPS window start (monotonic, not wall clock)
+            'avg_processing_time_ms': 0.0,
+            # Running totals for the current FPS window
+            'frame_count': 0,
+            'processing_time_total': 0.0
         }
         
     async def initialize(self):
@@ -172,7 +189,7 @@ class WebSDRController:
         self.is_connected = False
         
         # Clear audio buffer
-        self.audio_buffer.clear()
+        self.audio_buffer_fill = 0
         
         logger.info("SDR stopped")
     
@@ -252,19 +269,21 @@ class WebSDRController:
                 return None
             
             # Process spectrum
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             frequencies, spectrum_db = self.spectrum_processor.process_samples(samples)
-            processing_time = time.time() - start_time
+            processing_time = (time.perf_counter_ns() - start_ns) / 1e9
             
             # Update performance stats
             self._update_performance_stats(processing_time)
             
             # Create spectrum data
+            # Timestamp is Unix epoch seconds (cheap per frame, and numeric so
+            # clients can compute data age directly)
             spectrum_data = {
+                'timestamp': time.time(),
                 'type': 'spectrum',
                 'frequencies': frequencies.tolist(),
                 'spectrum': spectrum_db.tolist(),
-                'timestamp': datetime.now().isoformat(),
                 'sample_rate': self.current_config['sample_rate'],
                 'center_frequency': self.current_config['center_frequency'],
                 'fft_size': config.fft_size,
@@ -284,27 +303,23 @@ class WebSDRController:
                 audio_samples = await self._process_audio(samples)
                 if audio_samples is not None and len(audio_samples) > 0:
                     # Log audio generation rate periodically
-                    logger.debug(f"Audio samples generated: {len(audio_samples)}, mode: {self.demod_config['mode']}")
+                    logger.debug("Audio samples generated: %d, mode: %s", len(audio_samples), self.demod_config['mode'])
 
                     # Add to audio buffer for accumulation
-                    # Convert numpy array to Python list to avoid JSON serialization issues
-                    if hasattr(audio_samples, 'tolist'):
-                        self.audio_buffer.extend(audio_samples.tolist())
-                    else:
-                        self.audio_buffer.extend(list(audio_samples))
+                    self._buffer_audio(audio_samples)
 
-                    logger.debug(f"Audio buffer size: {len(self.audio_buffer)}/{self.target_audio_chunk_size}")
+                    logger.debug("Audio buffer size: %d/%d", self.audio_buffer_fill, self.target_audio_chunk_size)
 
                     # Send when we have enough samples for a smooth chunk
-                    if len(self.audio_buffer) >= self.target_audio_chunk_size:
-                        chunk_samples = self.audio_buffer[:self.target_audio_chunk_size]
-                        self.audio_buffer = self.audio_buffer[self.target_audio_chunk_size:]
+                    if self.audio_buffer_fill >= self.target_audio_chunk_size:
+                        # Convert to Python list only for the outgoing chunk (JSON serialization)
+                        chunk_samples = self._take_audio_chunk().tolist()
                         
                         self.audio_data = {
+                            'timestamp': time.time(),
                             'type': 'audio',
-                            'samples': chunk_samples,  # Already a Python list
+                            'samples': chunk_samples,
                             'sample_rate': config.audio_sample_rate,
-                            'timestamp': datetime.now().isoformat(),
                             'mode': self.demod_config['mode'],
                             'metadata': {
                                 'bandwidth': self.demod_config['bandwidth'],
@@ -319,6 +334,26 @@ class WebSDRController:
             logger.error(f"Error processing spectrum data: {e}")
             return None
     
+    def _buffer_audio(self, audio_samples: np.ndarray):
+        """Append demodulated audio to the preallocated buffer, growing it if needed"""
+        count = len(audio_samples)
+        needed = self.audio_buffer_fill + count
+        if needed > len(self.audio_buffer):
+            grown = np.zeros(max(needed, 2 * len(self.audio_buffer)), dtype=np.float32)
+            grown[:self.audio_buffer_fill] = self.audio_buffer[:self.audio_buffer_fill]
+            self.audio_buffer = grown
+        self.audio_buffer[self.audio_buffer_fill:needed] = audio_samples
+        self.audio_buffer_fill = needed
+    
+    def _take_audio_chunk(self) -> np.ndarray:
+        """Remove one target-sized chunk from the front of the audio buffer"""
+        chunk_size = self.target_audio_chunk_size
+        chunk = self.audio_buffer[:chunk_size].copy()
+        remaining = self.audio_buffer_fill - chunk_size
+        self.audio_buffer[:remaining] = self.audio_buffer[chunk_size:self.audio_buffer_fill]
+        self.audio_buffer_fill = remaining
+        return chunk
+    
     async def get_audio_data(self) -> Optional[Dict[str, Any]]:
         """Get latest audio data for WebSocket streaming"""
         if self.audio_data and not self.audio_data.get('_sent', False):
@@ -339,8 +374,8 @@ class WebSDRController:
         
         while self.is_running:
             try:
-                # Read samples from SDR
-                samples = self.sdr.read_samples(read_size)
+                # Read raw bytes from SDR (2 bytes per IQ sample)
+                samples = bytes_to_iq(self.sdr.read_bytes(2 * read_size))
                 
                 # Add to processing queue (non-blocking)
                 try:
@@ -408,10 +443,13 @@ class WebSDRController:
             
             if bandwidth < audio_rate / 2:  # Avoid aliasing
                 from scipy import signal as scipy_signal
-                # Design low-pass filter for bandwidth limiting
-                nyquist = audio_rate / 2
-                normalized_cutoff = bandwidth / nyquist
-                b, a = scipy_signal.butter(4, normalized_cutoff, btype='low')
+                # Design low-pass filter for bandwidth limiting (cached per bandwidth)
+                filter_key = (bandwidth, audio_rate)
+                if filter_key not in self._bandwidth_filter_cache:
+                    nyquist = audio_rate / 2
+                    normalized_cutoff = bandwidth / nyquist
+                    self._bandwidth_filter_cache[filter_key] = scipy_signal.butter(4, normalized_cutoff, btype='low')
+                b, a = self._bandwidth_filter_cache[filter_key]
                 audio = scipy_signal.filtfilt(b, a, audio)
             
             # Normalize audio
@@ -428,21 +466,44 @@ class WebSDRController:
     
     def _update_performance_stats(self, processing_time: float):
         """Update performance statistics"""
-        current_time = time.time()
+        current_time = time.monotonic()
         
         # Track processing times
-        self.stats['processing_times'].append(processing_time)
-        if len(self.stats['processing_times']) > 100:
-            self.stats['processing_times'].pop(0)
+        self.stats['frame_count'] += 1
+        self.stats['processing_time_total'] += processing_time
         
         # Update FPS calculation
         if current_time - self.stats['last_fps_time'] >= 1.0:
             # Calculate FPS based on spectrum updates
             time_diff = current_time - self.stats['last_fps_time']
-            frame_count = len(self.stats['processing_times'])
+            frame_count = self.stats['frame_count']
             self.stats['fps'] = frame_count / time_diff if time_diff > 0 else 0
+            self.stats['avg_processing_time_ms'] = (
+                self.stats['processing_time_total'] / frame_count * 1000
+            )
             self.stats['last_fps_time'] = current_time
-            self.stats['processing_times'].clear()
+            self.stats['frame_count'] = 0
+            self.stats['processing_time_total'] = 0.0
+    
+    def reset_stats(self):
+        """Reset performance statistics and drop buffered data between sessions"""
+        self.stats['samples_processed'] = 0
+        self.stats['fps'] = 0.0
+        self.stats['last_fps_time'] = time.monotonic()
+        self.stats['avg_processing_time_ms'] = 0.0
+        self.stats['frame_count'] = 0
+        self.stats['processing_time_total'] = 0.0
+        
+        # Discard samples and audio left over from a previous run
+        while True:
+            try:
+                self.data_queue.get_nowait()
+            except Empty:
+                break
+        self.audio_buffer_fill = 0
+        self.spectrum_data = None
+        self.audio_data = None
+        self.spectrum_processor.reset()
     
     async def cleanup(self):
         """Cleanup resources"""
@@ -29,6 +29,11 @@ class AudioDemodulators:
         # Filter design parameters
         self._audio_filter_cache = {}
         
+        # Conjugated CW BFO per (length, sample rate, tone); entries are block-sized
+        # (~2 MB at 240k samples), so only the most recent few are kept
+        self._cw_bfo_cache = {}
+        self._cw_bfo_cache_size = 4
+        
         logger.debug(f"Audio demodulators initialized for {audio_sample_rate} Hz output")
     
     def am_demodulate(self, iq_samples: np.ndarray, sample_rate: float,
@@ -62,7 +67,7 @@ class AudioDemodulators:
             # Normalize and apply AGC
             audio = self._apply_agc(audio, target_level=0.3)
             
-            return audio.astype(np.float32)
+            return audio.astype(np.float32, copy=False)
             
         except Exception as e:
             logger.error(f"Error in AM demodulation: {e}")
@@ -140,7 +145,7 @@ class AudioDemodulators:
             # Apply AGC with appropriate settings for FM
             audio = self._apply_agc(audio, target_level=0.4, attack_time=0.001, release_time=0.1)
             
-            return audio.astype(np.float32)
+            return audio.astype(np.float32, copy=False)
             
         except Exception as e:
             logger.error(f"Error in FM demodulation: {e}")
@@ -190,7 +195,7 @@ class AudioDemodulators:
             # Apply AGC with faster attack for SSB
             audio = self._apply_agc(audio, target_level=0.4, attack_time=0.001)
             
-            return audio.astype(np.float32)
+            return audio.astype(np.float32, copy=False)
             
         except Exception as e:
             logger.error(f"Error in SSB demodulation: {e}")
@@ -211,14 +216,19 @@ class AudioDemodulators:
             Demodulated audio samples
         """
         try:
-            # Generate BFO (Beat Frequency Oscillator)
-            t = np.arange(len(iq_samples)) / sample_rate
-            bfo_i = np.cos(2 * np.pi * tone_frequency * t)
-            bfo_q = np.sin(2 * np.pi * tone_frequency * t)
-            bfo = bfo_i + 1j * bfo_q
+            # Get conjugated BFO (Beat Frequency Oscillator), cached per block size
+            bfo_key = (len(iq_samples), sample_rate, tone_frequency)
+            bfo_conj = self._cw_bfo_cache.get(bfo_key)
+            if bfo_conj is None:
+                t = np.arange(len(iq_samples)) / sample_rate
+                bfo_conj = np.exp(-2j * np.pi * tone_frequency * t).astype(np.complex64)
+                if len(self._cw_bfo_cache) >= self._cw_bfo_cache_size:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    del self._cw_bfo_cache[next(iter(self._cw_bfo_cache))]
+                self._cw_bfo_cache[bfo_key] = bfo_conj
             
             # Mix with BFO
-            mixed = iq_samples * np.conj(bfo)
+            mixed = iq_samples * bfo_conj
             
             # Take real part for audio
             audio = np.real(mixed)
@@ -236,7 +246,7 @@ class AudioDemodulators:
             # Apply AGC with very fast attack for CW
             audio = self._apply_agc(audio, target_level=0.5, attack_time=0.0001)
             
-            return audio.astype(np.float32)
+            return audio.astype(np.float32, copy=False)
             
         except Exception as e:
             logger.error(f"Error in CW demodulation: {e}")
@@ -301,8 +311,12 @@ class AudioDemodulators:
             if cutoff_norm >= 1.0:
                 return audio  # No filtering needed
             
-            # First-order lowpass filter for de-emphasis
-            b, a = scipy_signal.butter(1, cutoff_norm, btype='lowpass')
+            # First-order lowpass filter for de-emphasis (designed once per rate)
+            filter_key = f"deemphasis_{sample_rate}_{time_constant}"
+            if filter_key not in self._audio_filter_cache:
+                self._audio_filter_cache[filter_key] = scipy_signal.butter(1, cutoff_norm, btype='lowpass')
+            
+            b, a = self._audio_filter_cache[filter_key]
             deemphasized = scipy_signal.filtfilt(b, a, audio)
             
             return deemphasized
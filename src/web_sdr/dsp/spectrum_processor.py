@@ -6,7 +6,7 @@ Optimized spectrum analysis with configurable parameters
 import numpy as np
 import logging
 from typing import Tuple, Optional
-from scipy import signal as scipy_signal
+from scipy import fft as scipy_fft
 
 logger = logging.getLogger(__name__)
 
@@ -41,23 +41,35 @@ class SpectrumProcessor:
         self.overlap_samples = int(fft_size * overlap)
         self.overlap_buffer = np.zeros(self.overlap_samples, dtype=np.complex64)
         
+        # Per-frame power scratch buffer, reused instead of allocating every frame
+        self._power_buffer = np.empty(fft_size, dtype=np.float32)
+        
         # Performance optimization
         self.use_fftw = False
         try:
-            import pyfftw
-            self.fftw_input = pyfftw.empty_aligned(fft_size, dtype='complex64')
-            self.fftw_output = pyfftw.empty_aligned(fft_size, dtype='complex64')
-            self.fftw_object = pyfftw.FFTW(self.fftw_input, self.fftw_output)
+            self._plan_fftw(fft_size)
             self.use_fftw = True
             logger.info("Using FFTW for accelerated FFT computation")
         except ImportError:
-            logger.info("Using NumPy FFT (install pyfftw for better performance)")
+            logger.info("Using SciPy FFT (install pyfftw for better performance)")
         
         # Smoothing and averaging
         self.enable_smoothing = True
         self.smoothing_factor = 0.3
         self.previous_spectrum = None
         
+    def _plan_fftw(self, fft_size: int):
+        """Allocate aligned FFTW buffers and plan the FFT for a size"""
+        import pyfftw
+        self.fftw_input = pyfftw.empty_aligned(fft_size, dtype='complex64')
+        self.fftw_output = pyfftw.empty_aligned(fft_size, dtype='complex64')
+        self.fftw_object = pyfftw.FFTW(self.fftw_input, self.fftw_output)
+    
+    def reset(self):
+        """Clear streaming state (smoothing history and overlap buffer)"""
+        self.previous_spectrum = None
+        self.overlap_buffer.fill(0)
+    
     def _create_window(self) -> np.ndarray:
         """Create window function"""
         if self.window_type == 'hann':
@@ -95,16 +107,11 @@ class SpectrumProcessor:
             self.window = self._create_window()
             self.overlap_samples = int(fft_size * self.overlap)
             self.overlap_buffer = np.zeros(self.overlap_samples, dtype=np.complex64)
+            self._power_buffer = np.empty(fft_size, dtype=np.float32)
             
             # Update FFTW objects if using
             if self.use_fftw:
-                try:
-                    import pyfftw
-                    self.fftw_input = pyfftw.empty_aligned(fft_size, dtype='complex64')
-                    self.fftw_output = pyfftw.empty_aligned(fft_size, dtype='complex64')
-                    self.fftw_object = pyfftw.FFTW(self.fftw_input, self.fftw_output)
-                except ImportError:
-                    self.use_fftw = False
+                self._plan_fftw(fft_size)
             updated = True
         
         if updated:
@@ -127,33 +134,24 @@ class SpectrumProcessor:
             if len(samples) < self.fft_size:
                 # Zero-pad if necessary
                 padded = np.zeros(self.fft_size, dtype=np.complex64)
-                padded[:len(samples)] = samples.astype(np.complex64)
+                padded[:len(samples)] = samples
                 samples = padded
             elif len(samples) > self.fft_size:
                 # Use overlap-add processing for long sequences
                 return self._process_long_sequence(samples)
             else:
-                samples = samples.astype(np.complex64)
+                samples = samples.astype(np.complex64, copy=False)
             
-            # Apply window function
-            windowed = samples * self.window
+            # Apply window and compute FFT
+            fft_result = self._windowed_fft(samples)
             
-            # Compute FFT
-            if self.use_fftw:
-                self.fftw_input[:] = windowed
-                self.fftw_object()
-                fft_result = self.fftw_output.copy()
-            else:
-                fft_result = np.fft.fft(windowed)
-            
-            # Shift zero frequency to center
-            fft_shifted = np.fft.fftshift(fft_result)
+            # Compute power spectrum (float32, squared in place in the scratch buffer;
+            # _power_to_db's fftshift returns a new array, so the buffer never escapes)
+            power_spectrum = np.abs(fft_result, out=self._power_buffer)
+            power_spectrum *= power_spectrum
             
-            # Compute power spectrum
-            power_spectrum = np.abs(fft_shifted) ** 2
-            
-            # Convert to dB
-            spectrum_db = 10 * np.log10(np.maximum(power_spectrum, 1e-10))
+            # Convert to dB and shift zero frequency to center
+            spectrum_db = self._power_to_db(power_spectrum)
             
             # Apply smoothing if enabled
             if self.enable_smoothing and self.previous_spectrum is not None:
@@ -169,9 +167,32 @@ class SpectrumProcessor:
             # Return empty arrays on error
             return np.array([]), np.array([])
     
+    def _windowed_fft(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Window one frame and compute its FFT
+        
+        With FFTW the window is applied straight into the aligned input
+        buffer and the plan's output buffer is returned without copying, so
+        the result is only valid until the next call.
+        """
+        if self.use_fftw:
+            np.multiply(frame, self.window, out=self.fftw_input)
+            return self.fftw_object()
+        
+        # scipy.fft keeps complex64 precision (numpy.fft upcasts to complex128)
+        # and may transform the windowed temporary in place
+        return scipy_fft.fft(frame * self.window, overwrite_x=True, workers=-1)
+    
+    def _power_to_db(self, power_spectrum: np.ndarray) -> np.ndarray:
+        """Convert a power spectrum to dB in place and shift zero frequency to center"""
+        np.maximum(power_spectrum, 1e-10, out=power_spectrum)
+        np.log10(power_spectrum, out=power_spectrum)
+        power_spectrum *= 10
+        return np.fft.fftshift(power_spectrum)
+    
     def _process_long_sequence(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """Process long sample sequences using overlap-add"""
-        samples = samples.astype(np.complex64)
+        samples = samples.astype(np.complex64, copy=False)
         
         # Calculate hop size
         hop_size = self.fft_size - self.overlap_samples
@@ -187,7 +208,8 @@ class SpectrumProcessor:
             return self.process_samples(padded)
         
         # Process frames and accumulate power spectra
-        power_accumulator = np.zeros(self.fft_size)
+        power_accumulator = np.zeros(self.fft_size, dtype=np.float32)
+        frame_power = self._power_buffer
         frame_count = 0
         
         for i in range(num_frames):
@@ -199,28 +221,21 @@ class SpectrumProcessor:
             
             frame = samples[start_idx:end_idx]
             
-            # Apply window
-            windowed = frame * self.window
-            
-            # Compute FFT
-            if self.use_fftw:
-                self.fftw_input[:] = windowed
-                self.fftw_object()
-                fft_result = self.fftw_output.copy()
-            else:
-                fft_result = np.fft.fft(windowed)
+            # Apply window and compute FFT
+            fft_result = self._windowed_fft(frame)
             
             # Accumulate power
-            power_accumulator += np.abs(fft_result) ** 2
+            np.abs(fft_result, out=frame_power)
+            frame_power *= frame_power
+            power_accumulator += frame_power
             frame_count += 1
         
         if frame_count > 0:
             # Average the accumulated power
-            power_spectrum = power_accumulator / frame_count
+            power_accumulator /= frame_count
             
-            # Shift and convert to dB
-            power_shifted = np.fft.fftshift(power_spectrum)
-            spectrum_db = 10 * np.log10(np.maximum(power_shifted, 1e-10))
+            # Convert to dB and shift
+            spectrum_db = self._power_to_db(power_accumulator)
             
             # Apply smoothing
             if self.enable_smoothing and self.previous_spectrum is not None:
@@ -271,9 +286,10 @@ class SpectrumProcessor:
         if self.frequencies is None or len(self.frequencies) == 0:
             return 0
         
-        # Find closest frequency bin
-        freq_diff = np.abs(self.frequencies - frequency)
-        return int(np.argmin(freq_diff))
+        # Bins are evenly spaced, so the closest one follows from the offset
+        resolution = self.sample_rate / self.fft_size
+        bin_index = int(round((frequency - self.frequencies[0]) / resolution))
+        return min(max(bin_index, 0), len(self.frequencies) - 1)
     
     def get_spectrum_info(self) -> dict:
         """Get spectrum processor information"""
@@ -6,11 +6,13 @@ FastAPI-based web interface for multi-band SDR with demodulation
 
 import asyncio
 import logging
+import logging.handlers
+import queue
 import signal
 import sys
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles  
@@ -24,13 +26,38 @@ from .config import config, EXTENDED_RADIO_BANDS, DEMOD_MODES
 from .services.websocket_service import WebSocketManager
 from .controllers.sdr_controller import WebSDRController
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO if not config.debug else logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def start_queued_logging() -> Tuple[List[logging.Handler], logging.handlers.QueueListener]:
+    """Route root logging through a queue drained by a listener thread
+    
+    Records are only enqueued on the calling (event loop) thread; the listener
+    does the formatting and stderr writes so a slow console never stalls
+    streaming. Done at server startup, not import, so importing this module
+    leaves logging alone. Returns the root handlers it replaced.
+    """
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    
+    root_logger = logging.getLogger()
+    previous_handlers = root_logger.handlers[:]
+    root_logger.handlers = [queue_handler]
+    root_logger.setLevel(logging.INFO if not config.debug else logging.DEBUG)
+    return previous_handlers, listener
+
+def stop_queued_logging(previous_handlers: List[logging.Handler],
+                        listener: logging.handlers.QueueListener):
+    """Restore the root handlers and flush the listener's pending records"""
+    logging.getLogger().handlers = previous_handlers
+    listener.stop()
+
 # Global instances
 websocket_manager = WebSocketManager()
 sdr_controller = WebSDRController()
@@ -38,6 +65,7 @@ sdr_controller = WebSDRController()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
+    previous_log_handlers, log_listener = start_queued_logging()
     logger.info("Starting H1SDR WebSDR server...")
     
     # Startup
@@ -52,6 +80,7 @@ async def lifespan(app: FastAPI):
         
     except Exception as e:
         logger.error(f"Failed to initialize application: {e}")
+        stop_queued_logging(previous_log_handlers, log_listener)
         raise
     
     yield
@@ -64,6 +93,8 @@ async def lifespan(app: FastAPI):
         logger.info("Cleanup completed")
     except Exception as e:
         logger.error(f"Error during cleanup: {e}")
+    finally:
+        stop_queued_logging(previous_log_handlers, log_listener)
 
 # Create FastAPI application
 app = FastAPI(
@@ -407,15 +438,35 @@ async def spectrum_streaming_task():
     """Background task for streaming spectrum data"""
     logger.info("Starting spectrum streaming task")
     
+    idle_interval = 0.2  # Poll interval while there is nothing to stream
+    
+    # Retry delay after an error: doubles on consecutive errors up to a few
+    # seconds (clients see a frozen spectrum meanwhile), reset by the next frame
+    min_error_backoff = 0.5
+    max_error_backoff = 4.0
+    error_backoff = min_error_backoff
+    consecutive_errors = 0
+    
     while True:
         try:
+            # Fast path: SDR stopped or no clients, skip the pipeline entirely
+            if not sdr_controller.is_running or not (
+                websocket_manager.spectrum_clients or websocket_manager.audio_clients
+            ):
+                await asyncio.sleep(idle_interval)
+                continue
+            
+            # Spectrum and audio clients are independent, so their sends are
+            # collected here and dispatched concurrently below
+            broadcasts = []
+            
             if sdr_controller.is_running and len(websocket_manager.spectrum_clients) > 0:
                 # Get spectrum data from SDR
                 spectrum_data = await sdr_controller.get_spectrum_data()
                 if spectrum_data:
                     # Broadcast to all spectrum clients
-                    await websocket_manager.broadcast_spectrum(spectrum_data)
-                    
+                    broadcasts.append(websocket_manager.broadcast_spectrum(spectrum_data))
+            
                     # Also send to waterfall clients (DISABLED for performance)
                     # if len(websocket_manager.waterfall_clients) > 0:
                     #     waterfall_data = {
@@ -430,14 +481,28 @@ async def spectrum_streaming_task():
             if sdr_controller.is_running and len(websocket_manager.audio_clients) > 0:
                 audio_data = await sdr_controller.get_audio_data()
                 if audio_data:
-                    await websocket_manager.broadcast_audio(audio_data)
+                    broadcasts.append(websocket_manager.broadcast_audio(audio_data))
+            
+            if broadcasts:
+                # One failing broadcast must not cancel the other, but its error is still logged
+                results = await asyncio.gather(*broadcasts, return_exceptions=True)
+                for result in results:
+                    if isinstance(result, BaseException):
+                        logger.error(f"Error broadcasting stream data: {result!r}")
+                
+                if consecutive_errors:
+                    logger.info(f"Spectrum streaming recovered after {consecutive_errors} error(s)")
+                    consecutive_errors = 0
+                    error_backoff = min_error_backoff
             
             # Control streaming rate
             await asyncio.sleep(1.0 / config.spectrum_fps)
             
         except Exception as e:
-            logger.error(f"Error in spectrum streaming task: {e}")
-            await asyncio.sleep(1.0)
+            consecutive_errors += 1
+            logger.error(f"Error in spectrum streaming task: {e} (retrying in {error_backoff:.1f}s)")
+            await asyncio.sleep(error_backoff)
+            error_backoff = min(error_backoff * 2, max_error_backoff)
 
 # Signal handlers
 def signal_handler(signum, frame):
@@ -448,6 +513,12 @@ def signal_handler(signum, frame):
 # Main entry point
 def main():
     """Main entry point for the WebSDR server"""
+    # Plain console logging until the app's lifespan switches to the queued setup
+    logging.basicConfig(
+        level=logging.INFO if not config.debug else logging.DEBUG,
+        format=LOG_FORMAT
+    )
+    
     # Setup signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -6,11 +6,49 @@ High-performance WebSocket management for real-time streaming
 import asyncio
 import json
 import logging
-from typing import List, Dict, Any, Set
+import struct
+import numpy as np
+from typing import List, Dict, Any, Set, Tuple, Union
 from fastapi import WebSocket, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
 
+# Use orjson for message encoding when available (much faster on large spectrum frames).
+# Both encoders return the text message and its UTF-8 size, so the size used for
+# statistics never needs a second encoding pass.
+try:
+    import orjson
+    
+    def _encode_message(data: Any) -> Tuple[str, int]:
+        encoded = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+        return encoded.decode('utf-8'), len(encoded)
+except ImportError:
+    def _encode_message(data: Any) -> Tuple[str, int]:
+        # ensure_ascii (the default) keeps every character a single byte
+        message = json.dumps(data)
+        return message, len(message)
+
+# Spectrum clients that request this subprotocol receive binary frames instead
+# of JSON, in the layout the web client's parseSpectrumData reads: a 16-byte
+# little-endian header (uint32 timestamp, float32 sample_rate, float32
+# center_frequency, uint32 fft_size) followed by fft_size float32 dB bins.
+# The timestamp is Unix epoch milliseconds modulo 2**32, so a frame's age is
+# (now_ms - timestamp) % 2**32
+BINARY_SPECTRUM_SUBPROTOCOL = "binary-spectrum"
+BINARY_SPECTRUM_HEADER = struct.Struct('<IffI')
+
+# Binary clients may ask for several frames per message with ?batch_size=N;
+# a batch is N frames back to back, oldest first
+MAX_SPECTRUM_BATCH_SIZE = 16
+
+def _encode_binary_spectrum(data: Dict[str, Any]) -> bytes:
+    """Pack a spectrum message into the binary-spectrum frame layout"""
+    bins = np.asarray(data['spectrum'], dtype='<f4')
+    header = BINARY_SPECTRUM_HEADER.pack(int(data['timestamp'] * 1000) & 0xFFFFFFFF,
+                                         data['sample_rate'], data['center_frequency'],
+                                         len(bins))
+    return header + bins.tobytes()
+
 class WebSocketManager:
     """Manages WebSocket connections for different data streams"""
     
@@ -20,6 +58,11 @@ class WebSocketManager:
         self.audio_clients: List[WebSocket] = []
         self.waterfall_clients: List[WebSocket] = []
         
+        # Spectrum clients that negotiated BINARY_SPECTRUM_SUBPROTOCOL, with
+        # their batch size and the frames held back for the next batch
+        self.binary_spectrum_clients: Dict[WebSocket, int] = {}
+        self.pending_spectrum_frames: Dict[WebSocket, List[bytes]] = {}
+        
         # Unified connection tracking
         self.active_connections: Set[WebSocket] = set()
         
@@ -40,7 +83,16 @@ class WebSocketManager:
     # Spectrum WebSocket management
     async def connect_spectrum(self, websocket: WebSocket):
         """Connect a spectrum client"""
-        await websocket.accept()
+        binary = BINARY_SPECTRUM_SUBPROTOCOL in websocket.scope.get('subprotocols', [])
+        if binary:
+            await websocket.accept(subprotocol=BINARY_SPECTRUM_SUBPROTOCOL)
+            try:
+                batch_size = int(websocket.query_params.get('batch_size', 1))
+            except ValueError:
+                batch_size = 1
+            self.binary_spectrum_clients[websocket] = max(1, min(batch_size, MAX_SPECTRUM_BATCH_SIZE))
+        else:
+            await websocket.accept()
         self.spectrum_clients.append(websocket)
         self.active_connections.add(websocket)
         
@@ -52,7 +104,12 @@ class WebSocketManager:
             'bytes_sent': 0
         }
         
-        logger.info(f"Spectrum client connected: {client_id} (total: {len(self.spectrum_clients)})")
+        logger.info(f"Spectrum client connected: {client_id} (total: {len(self.spectrum_clients)}"
+                    f"{', binary' if binary else ''})")
+        
+        # Binary clients get spectrum frames only
+        if binary:
+            return
         
         # Send initial status
         await self._send_safe(websocket, {
@@ -68,6 +125,8 @@ class WebSocketManager:
         
         if websocket in self.spectrum_clients:
             self.spectrum_clients.remove(websocket)
+        self.binary_spectrum_clients.pop(websocket, None)
+        self.pending_spectrum_frames.pop(websocket, None)
         
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
@@ -161,13 +220,31 @@ class WebSocketManager:
         if not self.spectrum_clients:
             return
         
-        message = json.dumps(data)
-        message_size = len(message.encode('utf-8'))
+        # Encode each wire format once, and only if some client uses it
+        text_message = binary_message = None
         
         # Send to all clients concurrently
         tasks = []
         for websocket in self.spectrum_clients.copy():  # Copy to avoid modification during iteration
-            tasks.append(self._send_with_stats(websocket, message, message_size, 'spectrum'))
+            batch_size = self.binary_spectrum_clients.get(websocket)
+            if batch_size is not None:
+                if binary_message is None:
+                    binary_message = _encode_binary_spectrum(data)
+                if batch_size == 1:
+                    tasks.append(self._send_with_stats(websocket, binary_message, len(binary_message), 'spectrum'))
+                    continue
+                
+                # Hold frames back until the client's batch is full, then send one message
+                pending = self.pending_spectrum_frames.setdefault(websocket, [])
+                pending.append(binary_message)
+                if len(pending) >= batch_size:
+                    batch = b''.join(pending)
+                    pending.clear()
+                    tasks.append(self._send_with_stats(websocket, batch, len(batch), 'spectrum'))
+            else:
+                if text_message is None:
+                    text_message, text_size = _encode_message(data)
+                tasks.append(self._send_with_stats(websocket, text_message, text_size, 'spectrum'))
         
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
@@ -178,8 +255,7 @@ class WebSocketManager:
         if not self.audio_clients:
             return
         
-        message = json.dumps(data)
-        message_size = len(message.encode('utf-8'))
+        message, message_size = _encode_message(data)
         
         tasks = []
         for websocket in self.audio_clients.copy():
@@ -194,8 +270,7 @@ class WebSocketManager:
         if not self.waterfall_clients:
             return
         
-        message = json.dumps(data)
-        message_size = len(message.encode('utf-8'))
+        message, message_size = _encode_message(data)
         
         tasks = []
         for websocket in self.waterfall_clients.copy():
@@ -210,7 +285,7 @@ class WebSocketManager:
         """Send data to websocket with error handling"""
         try:
             if isinstance(data, dict):
-                message = json.dumps(data)
+                message, _ = _encode_message(data)
             else:
                 message = str(data)
             
@@ -225,10 +300,14 @@ class WebSocketManager:
             self._handle_disconnect(websocket)
             return False
     
-    async def _send_with_stats(self, websocket: WebSocket, message: str, size: int, stream_type: str) -> bool:
-        """Send message with statistics tracking"""
+    async def _send_with_stats(self, websocket: WebSocket, message: Union[str, bytes], size: int,
+                               stream_type: str) -> bool:
+        """Send message with statistics tracking (bytes go out as a binary frame)"""
         try:
-            await websocket.send_text(message)
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
             
             # Update client stats
             client_id = id(websocket)
@@ -251,6 +330,8 @@ class WebSocketManager:
         # Remove from all client lists
         if websocket in self.spectrum_clients:
             self.spectrum_clients.remove(websocket)
+        self.binary_spectrum_clients.pop(websocket, None)
+        self.pending_spectrum_frames.pop(websocket, None)
         if websocket in self.audio_clients:
             self.audio_clients.remove(websocket)
         if websocket in self.waterfall_clients:
@@ -304,6 +385,7 @@ class WebSocketManager:
         return {
             'total_clients': self.total_clients,
             'spectrum_clients': len(self.spectrum_clients),
+            'binary_spectrum_clients': len(self.binary_spectrum_clients),
             'audio_clients': len(self.audio_clients),
             'waterfall_clients': len(self.waterfall_clients),
             'message_counts': self.message_counts.copy(),
@@ -355,6 +437,8 @@ class WebSocketManager:
         
         # Clear all client lists
         self.spectrum_clients.clear()
+        self.binary_spectrum_clients.clear()
+        self.pending_spectrum_frames.clear()
         self.audio_clients.clear()
         self.waterfall_clients.clear()
         self.active_connections.clear()
@@ -0,0 +1,44 @@
+"""
+H1SDR test suite
+Makes the web_sdr package under src/ importable for all test modules
+and holds the helpers they share
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+SRC_PATH = str(Path(__file__).parent.parent / 'src')
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+# Run test event loops on uvloop when available (installed with uvicorn[standard]).
+# Loops are created explicitly, so the process-wide event loop policy is left
+# alone for other modules sharing the interpreter
+try:
+    import uvloop
+    new_event_loop = uvloop.new_event_loop
+except ImportError:
+    new_event_loop = asyncio.new_event_loop
+
+def run_async(coro):
+    """Run a test coroutine to completion on a fresh (uvloop when available) loop"""
+    with asyncio.Runner(loop_factory=new_event_loop) as runner:
+        return runner.run(coro)
+
+_http_session = None
+
+def http_session():
+    """Keep-alive HTTP session shared by the server-facing test modules (opened on first use)"""
+    global _http_session
+    if _http_session is None:
+        import requests
+        _http_session = requests.Session()
+    return _http_session
+
+def close_http_session():
+    """Close the shared HTTP session; the next http_session() call opens a fresh one"""
+    global _http_session
+    if _http_session is not None:
+        _http_session.close()
+        _http_session = None
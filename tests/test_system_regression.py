@@ -11,12 +11,8 @@ import time
 import requests
 import websockets
 import numpy as np
-import sys
-from pathlib import Path
 from threading import Thread, Event
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from rtlsdr import RtlSdr
@@ -28,14 +24,12 @@ from web_sdr.config import config, EXTENDED_RADIO_BANDS, DEMOD_MODES
 from web_sdr.controllers.sdr_controller import WebSDRController
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestCoreSystemFunctionality(unittest.TestCase):
     """Test all core system functionality without regressions"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         cls.base_url = "http://localhost:8000"
         cls.ws_base_url = "ws://localhost:8000"
         
@@ -47,12 +41,22 @@ class TestCoreSystemFunctionality(unittest.TestCase):
         except Exception:
             raise unittest.SkipTest("WebSDR server not accessible")
             
+    def _get_concurrently(self, *paths):
+        """GET independent endpoints in parallel, returning responses in order"""
+        with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+            return list(pool.map(lambda path: requests.get(f"{self.base_url}{path}"), paths))
+            
     def test_system_initialization_sequence(self):
         """Test complete system initialization sequence"""
         print("Testing system initialization...")
         
+        # Health, bands and modes are independent reads; fetch them together
+        health_response, bands_response, modes_response = self._get_concurrently(
+            "/api/health", "/api/bands", "/api/modes"
+        )
+        
         # 1. Verify server health
-        response = requests.get(f"{self.base_url}/api/health")
+        response = health_response
         self.assertEqual(response.status_code, 200)
         
         health_data = response.json()
@@ -60,7 +64,7 @@ class TestCoreSystemFunctionality(unittest.TestCase):
         self.assertIn("version", health_data)
         
         # 2. Verify bands configuration
-        response = requests.get(f"{self.base_url}/api/bands")
+        response = bands_response
         self.assertEqual(response.status_code, 200)
         
         bands_data = response.json()
@@ -76,7 +80,7 @@ class TestCoreSystemFunctionality(unittest.TestCase):
             self.assertIn(band, bands, f"Critical band {band} missing")
             
         # 3. Verify demod modes
-        response = requests.get(f"{self.base_url}/api/modes")
+        response = modes_response
         self.assertEqual(response.status_code, 200)
         
         modes_data = response.json()
@@ -102,15 +106,20 @@ class TestCoreSystemFunctionality(unittest.TestCase):
         
         time.sleep(3.0)  # Allow full initialization
         
+        # Status and configuration are independent reads; fetch them together
+        status_response, config_response = self._get_concurrently(
+            "/api/sdr/status", "/api/sdr/config"
+        )
+        
         # 2. Verify status after start
-        response = requests.get(f"{self.base_url}/api/sdr/status")
+        response = status_response
         self.assertEqual(response.status_code, 200)
         
         status_data = response.json()
         self.assertTrue(status_data["success"])
         
         # 3. Get configuration
-        response = requests.get(f"{self.base_url}/api/sdr/config")
+        response = config_response
         self.assertEqual(response.status_code, 200)
         
         config_data = response.json()
@@ -203,12 +212,12 @@ class TestCoreSystemFunctionality(unittest.TestCase):
         async def test_streaming():
             # Start SDR
             requests.post(f"{self.base_url}/api/sdr/start")
-            time.sleep(3.0)
+            await asyncio.sleep(3.0)
             
             # Tune to FM broadcast
             tune_data = {"frequency": 100e6, "gain": 25.0}
             requests.post(f"{self.base_url}/api/sdr/tune", json=tune_data)
-            time.sleep(1.0)
+            await asyncio.sleep(1.0)
             
             try:
                 # Test spectrum streaming
@@ -238,8 +247,7 @@ class TestCoreSystemFunctionality(unittest.TestCase):
                         self.assertEqual(len(frequencies), 4096)  # FFT size
                         
                         # Frequency ordering
-                        self.assertTrue(all(frequencies[j] <= frequencies[j+1] 
-                                          for j in range(len(frequencies)-1)))
+                        self.assertTrue(np.all(np.diff(frequencies) >= 0))
                         
                         # Spectrum values reasonable
                         spectrum_array = np.array(spectrum)
@@ -248,9 +256,8 @@ class TestCoreSystemFunctionality(unittest.TestCase):
                         self.assertTrue(np.all(np.isfinite(spectrum_array)))  # No NaN/inf
                         
                     # Verify timestamps are monotonic
-                    timestamps = [frame["timestamp"] for frame in frames]
-                    self.assertTrue(all(timestamps[i] <= timestamps[i+1] 
-                                      for i in range(len(timestamps)-1)))
+                    timestamps = np.array([frame["timestamp"] for frame in frames])
+                    self.assertTrue(np.all(np.diff(timestamps) >= 0))
                                       
                     print(f"✓ Processed {len(frames)} spectrum frames")
                     
@@ -259,7 +266,7 @@ class TestCoreSystemFunctionality(unittest.TestCase):
                 response = requests.post(f"{self.base_url}/api/demod/set", json=demod_data)
                 
                 if response.status_code == 200:
-                    time.sleep(1.0)
+                    await asyncio.sleep(1.0)
                     
                     uri = f"{self.ws_base_url}/ws/audio"
                     async with websockets.connect(uri, timeout=15) as websocket:
@@ -414,14 +421,12 @@ class TestCoreSystemFunctionality(unittest.TestCase):
         print("✓ Error handling verified")
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestSystemStabilityRegression(unittest.TestCase):
     """Test system stability and regression prevention"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         cls.base_url = "http://localhost:8000"
         cls.ws_base_url = "ws://localhost:8000"
         
@@ -517,12 +522,7 @@ def run_regression_tests():
     print("This will verify all core functionality works without regressions")
     print("=" * 70)
     
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Add all regression test cases
-    suite.addTests(loader.loadTestsFromTestCase(TestCoreSystemFunctionality))
-    suite.addTests(loader.loadTestsFromTestCase(TestSystemStabilityRegression))
+    suite = unittest.TestLoader().loadTestsFromName(__name__)
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
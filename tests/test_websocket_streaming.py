@@ -10,34 +10,30 @@ import json
 import time
 import websockets
 import numpy as np
-import sys
-from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
-import requests
 from threading import Event, Thread
 
-# Add src to path  
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
-
 try:
     from rtlsdr import RtlSdr
     RTL_SDR_AVAILABLE = True
 except ImportError:
     RTL_SDR_AVAILABLE = False
 
+from tests import run_async, http_session, close_http_session
 from web_sdr.main import app
 from web_sdr.controllers.sdr_controller import WebSDRController
 from web_sdr.services.websocket_service import WebSocketManager
 from web_sdr.config import config, EXTENDED_RADIO_BANDS
 
+def tearDownModule():
+    close_http_session()
+
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestWebSDRAPI(unittest.TestCase):
     """Test WebSDR FastAPI endpoints with real hardware"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         # Start WebSDR server in background
         cls.server_process = None
         cls.base_url = "http://localhost:8000"
@@ -64,20 +60,23 @@ class TestWebSDRAPI(unittest.TestCase):
             
     def setUp(self):
         """Wait for server and verify basic connectivity"""
-        # Wait a bit for server to fully initialize
-        time.sleep(1.0)
-        
-        # Verify server is responding
-        try:
-            response = requests.get(f"{self.base_url}/api/health", timeout=5)
-            if response.status_code != 200:
-                self.skipTest("WebSDR server not responding")
-        except Exception:
-            self.skipTest("WebSDR server not accessible")
+        # Poll health over the shared connection until the server is up
+        deadline = time.monotonic() + 5.0
+        skip_reason = "WebSDR server not accessible"
+        while time.monotonic() < deadline:
+            try:
+                response = http_session().get(f"{self.base_url}/api/health", timeout=5)
+                if response.status_code == 200:
+                    return
+                skip_reason = "WebSDR server not responding"
+            except Exception:
+                skip_reason = "WebSDR server not accessible"
+            time.sleep(0.1)
+        self.skipTest(skip_reason)
             
     def test_api_health_check(self):
         """Test API health endpoint"""
-        response = requests.get(f"{self.base_url}/api/health")
+        response = http_session().get(f"{self.base_url}/api/health")
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -88,7 +87,7 @@ class TestWebSDRAPI(unittest.TestCase):
     def test_api_sdr_control(self):
         """Test SDR control API endpoints"""
         # Test start SDR
-        response = requests.post(f"{self.base_url}/api/sdr/start")
+        response = http_session().post(f"{self.base_url}/api/sdr/start")
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -98,7 +97,7 @@ class TestWebSDRAPI(unittest.TestCase):
         time.sleep(2.0)
         
         # Test status
-        response = requests.get(f"{self.base_url}/api/sdr/status")
+        response = http_session().get(f"{self.base_url}/api/sdr/status")
         self.assertEqual(response.status_code, 200)
         
         status_data = response.json()
@@ -106,20 +105,20 @@ class TestWebSDRAPI(unittest.TestCase):
         
         # Test tuning
         tune_params = {"frequency": 100e6, "gain": 30.0}
-        response = requests.post(f"{self.base_url}/api/sdr/tune", params=tune_params)
+        response = http_session().post(f"{self.base_url}/api/sdr/tune", params=tune_params)
         self.assertEqual(response.status_code, 200)
         
         tune_response = response.json()
         self.assertTrue(tune_response.get("success", False))
         
         # Test stop
-        response = requests.post(f"{self.base_url}/api/sdr/stop")
+        response = http_session().post(f"{self.base_url}/api/sdr/stop")
         self.assertEqual(response.status_code, 200)
         
     def test_api_band_management(self):
         """Test band management API"""
         # Test get all bands
-        response = requests.get(f"{self.base_url}/api/bands")
+        response = http_session().get(f"{self.base_url}/api/bands")
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -130,7 +129,7 @@ class TestWebSDRAPI(unittest.TestCase):
         self.assertEqual(len(bands), 16)  # Should have 16 bands
         
         # Test specific band
-        response = requests.get(f"{self.base_url}/api/bands/fm_broadcast")
+        response = http_session().get(f"{self.base_url}/api/bands/fm_broadcast")
         self.assertEqual(response.status_code, 200)
         
         band_data = response.json()
@@ -141,13 +140,13 @@ class TestWebSDRAPI(unittest.TestCase):
         self.assertIn("center_freq", band_info)
         
         # Test tune to band
-        response = requests.post(f"{self.base_url}/api/bands/fm_broadcast/tune")
+        response = http_session().post(f"{self.base_url}/api/bands/fm_broadcast/tune")
         # Note: May fail if SDR not started, but should not crash
         self.assertIn(response.status_code, [200, 500])
         
     def test_api_demod_modes(self):
         """Test demodulation mode API"""
-        response = requests.get(f"{self.base_url}/api/modes")
+        response = http_session().get(f"{self.base_url}/api/modes")
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -159,20 +158,18 @@ class TestWebSDRAPI(unittest.TestCase):
         self.assertIn("SPECTRUM", modes)
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestWebSocketStreaming(unittest.TestCase):
     """Test WebSocket streaming with real RTL-SDR data"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         cls.base_url = "http://localhost:8000"
         cls.ws_base_url = "ws://localhost:8000"
         
         # Ensure server is running
         try:
-            response = requests.get(f"{cls.base_url}/api/health", timeout=5)
+            response = http_session().get(f"{cls.base_url}/api/health", timeout=5)
             if response.status_code != 200:
                 raise unittest.SkipTest("WebSDR server not running")
         except Exception:
@@ -181,18 +178,18 @@ class TestWebSocketStreaming(unittest.TestCase):
     def setUp(self):
         """Prepare SDR for streaming tests"""
         # Start SDR
-        response = requests.post(f"{self.base_url}/api/sdr/start")
+        response = http_session().post(f"{self.base_url}/api/sdr/start")
         if response.status_code == 200:
             time.sleep(2.0)  # Allow initialization
             
             # Tune to FM broadcast for reliable signals
             tune_data = {"frequency": 100e6, "gain": 30.0}
-            requests.post(f"{self.base_url}/api/sdr/tune", json=tune_data)
+            http_session().post(f"{self.base_url}/api/sdr/tune", json=tune_data)
             time.sleep(1.0)
             
     def tearDown(self):
         """Stop SDR after tests"""
-        requests.post(f"{self.base_url}/api/sdr/stop")
+        http_session().post(f"{self.base_url}/api/sdr/stop")
         
     def test_spectrum_websocket_connection(self):
         """Test spectrum WebSocket connection and data"""
@@ -237,7 +234,7 @@ class TestWebSocketStreaming(unittest.TestCase):
                 self.fail(f"WebSocket spectrum test failed: {e}")
                 
         # Run async test
-        asyncio.run(test_connection())
+        run_async(test_connection())
         
     def test_spectrum_streaming_rate(self):
         """Test spectrum streaming frame rate"""
@@ -254,9 +251,7 @@ class TestWebSocketStreaming(unittest.TestCase):
                         
                     # Calculate frame rate
                     if len(frame_times) >= 2:
-                        time_diffs = [frame_times[i+1] - frame_times[i] 
-                                     for i in range(len(frame_times)-1)]
-                        avg_interval = np.mean(time_diffs)
+                        avg_interval = np.diff(frame_times).mean()
                         frame_rate = 1.0 / avg_interval
                         
                         # Should be around 20 FPS (±50% tolerance)
@@ -266,17 +261,17 @@ class TestWebSocketStreaming(unittest.TestCase):
             except Exception as e:
                 self.fail(f"Frame rate test failed: {e}")
                 
-        asyncio.run(test_frame_rate())
+        run_async(test_frame_rate())
         
     def test_audio_websocket_demodulation(self):
         """Test audio WebSocket with FM demodulation"""
         async def test_audio():
             # Set FM demodulation
             demod_data = {"mode": "FM", "bandwidth": 15000}
-            response = requests.post(f"{self.base_url}/api/demod/set", json=demod_data)
+            response = http_session().post(f"{self.base_url}/api/demod/set", json=demod_data)
             
             if response.status_code == 200:
-                time.sleep(1.0)  # Allow demod to start
+                await asyncio.sleep(1.0)  # Allow demod to start
                 
                 uri = f"{self.ws_base_url}/ws/audio"
                 
@@ -309,7 +304,7 @@ class TestWebSocketStreaming(unittest.TestCase):
                 except Exception as e:
                     self.fail(f"Audio WebSocket test failed: {e}")
                     
-        asyncio.run(test_audio())
+        run_async(test_audio())
         
     def test_multiple_concurrent_connections(self):
         """Test multiple WebSocket connections"""
@@ -350,7 +345,7 @@ class TestWebSocketStreaming(unittest.TestCase):
                 else:
                     self.assertIn("success", str(result))
                     
-        asyncio.run(test_concurrent())
+        run_async(test_concurrent())
         
     def test_websocket_reconnection(self):
         """Test WebSocket reconnection handling"""
@@ -365,7 +360,7 @@ class TestWebSocketStreaming(unittest.TestCase):
                     self.assertEqual(data1.get("type"), "spectrum")
                     
                 # Connection closed, now reconnect
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
                 
                 async with websockets.connect(uri, timeout=10) as websocket2:
                     message2 = await asyncio.wait_for(websocket2.recv(), timeout=5.0)
@@ -378,17 +373,15 @@ class TestWebSocketStreaming(unittest.TestCase):
             except Exception as e:
                 self.fail(f"Reconnection test failed: {e}")
                 
-        asyncio.run(test_reconnection())
+        run_async(test_reconnection())
 
 
+@unittest.skipUnless(RTL_SDR_AVAILABLE, "RTL-SDR not available")
 class TestIntegratedWebSDR(unittest.TestCase):
     """Integration tests for complete WebSDR functionality"""
     
     @classmethod
     def setUpClass(cls):
-        if not RTL_SDR_AVAILABLE:
-            raise unittest.SkipTest("RTL-SDR not available")
-            
         cls.base_url = "http://localhost:8000"
         cls.ws_base_url = "ws://localhost:8000"
         
@@ -396,18 +389,18 @@ class TestIntegratedWebSDR(unittest.TestCase):
         """Test complete WebSDR workflow: start -> tune -> stream -> stop"""
         async def test_workflow():
             # 1. Start SDR
-            response = requests.post(f"{self.base_url}/api/sdr/start")
+            response = http_session().post(f"{self.base_url}/api/sdr/start")
             self.assertEqual(response.status_code, 200)
-            time.sleep(2.0)
+            await asyncio.sleep(2.0)
             
             # 2. Tune to band
-            response = requests.post(f"{self.base_url}/api/bands/fm_broadcast/tune")
+            response = http_session().post(f"{self.base_url}/api/bands/fm_broadcast/tune")
             self.assertEqual(response.status_code, 200)
-            time.sleep(1.0)
+            await asyncio.sleep(1.0)
             
             # 3. Set demodulation
             demod_data = {"mode": "SPECTRUM"}
-            response = requests.post(f"{self.base_url}/api/demod/set", json=demod_data)
+            response = http_session().post(f"{self.base_url}/api/demod/set", json=demod_data)
             self.assertEqual(response.status_code, 200)
             
             # 4. Connect to spectrum stream
@@ -426,9 +419,9 @@ class TestIntegratedWebSDR(unittest.TestCase):
                 self.assertLess(center_freq, 105e6)
                 
             # 6. Change to different band
-            response = requests.post(f"{self.base_url}/api/bands/2m_band/tune")
+            response = http_session().post(f"{self.base_url}/api/bands/2m_band/tune")
             self.assertEqual(response.status_code, 200)
-            time.sleep(1.0)
+            await asyncio.sleep(1.0)
             
             # 7. Verify frequency changed
             async with websockets.connect(uri, timeout=10) as websocket:
@@ -443,17 +436,17 @@ class TestIntegratedWebSDR(unittest.TestCase):
                 self.assertLess(center_freq, 147e6)
                 
             # 8. Stop SDR
-            response = requests.post(f"{self.base_url}/api/sdr/stop")
+            response = http_session().post(f"{self.base_url}/api/sdr/stop")
             self.assertEqual(response.status_code, 200)
             
-        asyncio.run(test_workflow())
+        run_async(test_workflow())
         
     def test_band_switching_with_streaming(self):
         """Test switching bands while streaming"""
         async def test_band_switching():
             # Start SDR
-            requests.post(f"{self.base_url}/api/sdr/start")
-            time.sleep(2.0)
+            http_session().post(f"{self.base_url}/api/sdr/start")
+            await asyncio.sleep(2.0)
             
             bands_to_test = ["fm_broadcast", "2m_band", "70cm_band"]
             
@@ -462,11 +455,11 @@ class TestIntegratedWebSDR(unittest.TestCase):
                 
                 for band_key in bands_to_test:
                     # Switch band
-                    response = requests.post(f"{self.base_url}/api/bands/{band_key}/tune")
+                    response = http_session().post(f"{self.base_url}/api/bands/{band_key}/tune")
                     self.assertEqual(response.status_code, 200)
                     
                     # Wait for tuning
-                    time.sleep(1.5)
+                    await asyncio.sleep(1.5)
                     
                     # Get spectrum data
                     message = await asyncio.wait_for(websocket.recv(), timeout=10.0)
@@ -483,9 +476,9 @@ class TestIntegratedWebSDR(unittest.TestCase):
                     self.assertAlmostEqual(center_freq, expected_freq, delta=1e6)
                     
             # Stop SDR
-            requests.post(f"{self.base_url}/api/sdr/stop")
+            http_session().post(f"{self.base_url}/api/sdr/stop")
             
-        asyncio.run(test_band_switching())
+        run_async(test_band_switching())
 
 
 def run_websocket_tests():
@@ -498,13 +491,7 @@ def run_websocket_tests():
     print("Note: These tests require WebSDR server to be running")
     
     # Run tests
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    # Add test cases
-    suite.addTests(loader.loadTestsFromTestCase(TestWebSDRAPI))
-    suite.addTests(loader.loadTestsFromTestCase(TestWebSocketStreaming))
-    suite.addTests(loader.loadTestsFromTestCase(TestIntegratedWebSDR))
+    suite = unittest.TestLoader().loadTestsFromName(__name__)
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)